@@ -257,7 +257,7 @@ class ShapeTool(BaseTool):
             p = self.back_cpc.control_points[-1].points
             p[0][0] = new_value
             self.back_cpc.control_points[-1].points = p
-            self.parametric_glider.shape.rib_distribution._data[:, 0] *= (new_value / old_value)
+            self.parametric_glider.shape.rib_distribution.scale(new_value / old_value, 1)
             self.cell_dist_cpc.control_pos = self.parametric_glider.shape.rib_dist_controlpoints
         self.update_shape(preview=True)
 
@@ -268,7 +268,7 @@ class ShapeTool(BaseTool):
             p = self.front_cpc.control_points[-1].points
             p[0][0] = new_value
             self.front_cpc.control_points[-1].points = p
-            self.parametric_glider.shape.rib_distribution._data[:, 0] *= (new_value / old_value)
+            self.parametric_glider.shape.rib_distribution.scale(new_value / old_value, 1)
             self.cell_dist_cpc.control_pos = self.parametric_glider.shape.rib_dist_controlpoints
         self.update_shape(preview=True)
 
@@ -21,17 +21,24 @@ __version__ = '0.05'
 __author__ = 'Booya'
 __path__ = __import__('pkgutil').extend_path(__path__, __name__)
 
+import zipfile
+
 import numpy as np
 
 from openglider.config import config
 import openglider.jsonify
 import openglider.glider
 
-def load(filename):
+def load(filename, profile=None):
     """
+    Load a json-file or a container written with save(..., array_format="npz")
+    :param profile: openglider.jsonify.LoadProfile to record the loading time per type
     """
-    with open(filename) as infile:
-        res = openglider.jsonify.load(infile)
+    if zipfile.is_zipfile(filename):
+        res = openglider.jsonify.load_container(filename, profile=profile)
+    else:
+        with open(filename) as infile:
+            res = openglider.jsonify.load(infile, profile=profile)
     if isinstance(res, dict) and "data" in res:
         # print(res["MetaData"])  # HakunaMaData
         return res["data"]
@@ -39,9 +46,16 @@ def load(filename):
     return res
 
 
-def save(data, filename, add_meta=True):
-    with open(filename,"w") as outfile:
-        openglider.jsonify.dump(data, outfile, add_meta=add_meta)
+def save(data, filename, add_meta=True, array_format="list"):
+    """
+    :param array_format: "list" (default), "base64" (binary arrays inside the json)
+        or "npz" (zip-container with the arrays as npy-files)
+    """
+    if array_format == "npz":
+        openglider.jsonify.dump_container(data, filename, add_meta=add_meta)
+    else:
+        with open(filename,"w") as outfile:
+            openglider.jsonify.dump(data, outfile, add_meta=add_meta, array_format=array_format)
 
 
 # Monkey-patch numpy cross for pypy
@@ -44,21 +44,43 @@ class Profile2D(Polygon2D):
         return super(Profile2D, self).__imul__(fakt)
 
     def __call__(self, xval):
-        xval = float(xval)
-        if xval < 0.:       # LOWER
-            i = 1
-            xval = -xval
-            while self[i][0] >= xval and i < len(self):
-                i += 1
-            i -= 1
-        elif xval == 0:     # NOSE
-            i = self.noseindex - 1
-        else:               # UPPER
-            i = len(self) - 2
-            while self[i][0] > xval and i > 1:
-                i -= 1
-                # Determine k-value
-        k = -(self[i][0] - xval) / (self[i + 1][0] - self[i][0])
+        """
+        Get the ik-value for a x-value (negative: upper side) or an array of x-values
+        """
+        if np.ndim(xval) > 0:
+            return self.get_ik_values(xval)
+
+        return float(self.get_ik_values([xval])[0])
+
+    def get_ik_values(self, x_values):
+        """
+        Vectorized version of __call__: get the ik-values for an array of x-values
+        (negative: upper side, positive: lower side) using a binary search on both sides.
+        """
+        x_values = np.asarray(x_values, dtype=float)
+        data_x = self.data[:, 0]
+        numpoints = len(data_x)
+        nose = self.noseindex
+
+        x_abs = np.abs(x_values)
+        i = np.empty(x_values.shape, dtype=int)
+
+        # upper side: x decreasing from the trailing edge to the nose
+        upper = x_values < 0
+        upper_x = data_x[:nose+1][::-1]
+        smaller = np.searchsorted(upper_x, x_abs[upper], side="left")
+        i[upper] = np.maximum(nose + 1 - smaller, 1) - 1
+
+        # nose
+        i[x_values == 0] = nose - 1
+
+        # lower side: x increasing from the nose to the trailing edge
+        lower = x_values > 0
+        lower_x = data_x[nose:numpoints-1]
+        smaller_equal = np.searchsorted(lower_x, x_abs[lower], side="right")
+        i[lower] = np.maximum(nose + smaller_equal - 1, 1)
+
+        k = (x_abs - data_x[i]) / (data_x[i + 1] - data_x[i])
 
         return i + k
 
@@ -126,13 +148,15 @@ class Profile2D(Polygon2D):
         return first
 
     def __iadd__(self, other):
-        for i, point in enumerate(self.data):
+        data = np.array(self.data)
+        for i, point in enumerate(data):
             if i > self.noseindex:
                 x = point[0]
             else:
                 x = -point[0]
 
             point[1] += other[other(x)][1]
+        self.data = data
         return self
 
     @classmethod
@@ -248,8 +272,9 @@ class Profile2D(Polygon2D):
     @x_values.setter
     def x_values(self, xval):
         """Set X-Values of airfoil to defined points."""
-        data = [(abs(x), self[self(x)][1]) for x in xval]
-        self.data = np.array(data)
+        xval = np.array(xval, dtype=float)
+        y_values = self.get_points(self.get_ik_values(xval))[:, 1]
+        self.data = np.array([np.abs(xval), y_values]).T
 
     @property
     def numpoints(self):
@@ -264,8 +289,10 @@ class Profile2D(Polygon2D):
     @property
     def thickness(self):
         """return the maximum sickness (Sic!) of an airfoil"""
-        xvals = sorted(set(map(abs, self.x_values)))
-        return max([self[self(-i)][1] - self[self(i)][1] for i in xvals])
+        xvals = np.unique(np.abs(self.x_values))
+        upper = self.get_points(self.get_ik_values(-xvals))
+        lower = self.get_points(self.get_ik_values(xvals))
+        return max(upper[:, 1] - lower[:, 1])
 
     @thickness.setter
     def thickness(self, newthick):
@@ -278,8 +305,10 @@ class Profile2D(Polygon2D):
 
     @property
     def camber_line(self):
-        xvals = sorted(set(map(abs, self.x_values)))
-        return np.array([self.profilepoint(i, 0.) for i in xvals])
+        xvals = np.unique(np.abs(self.x_values))
+        upper = self.get_points(self.get_ik_values(-xvals))
+        lower = self.get_points(self.get_ik_values(xvals))
+        return (upper + lower) / 2
 
     #@cached_property('self')
     @property
@@ -338,9 +367,9 @@ class Profile2D(Polygon2D):
         ik = self(pos)
         diff = ik % 1.
         if diff < 0.5:
-            self.data[int(ik)] = self.profilepoint(pos)
+            self[int(ik)] = self.profilepoint(pos)
         else:
-            self.data[int(ik) + 1] = self.profilepoint(pos)
+            self[int(ik) + 1] = self.profilepoint(pos)
 
     def nearest_x_value(self, x):
         min_x_value = None
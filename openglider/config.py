@@ -5,8 +5,9 @@ from openglider.utils import Config
 
 
 class GlobalConfig(Config):
-    asinc_interpolation_points = 2000
+    asinc_tolerance = 1e-12  # radians
     caching = True
+    cache_mode = "version"  # "version" (track mutations) or "hash" (hash the content)
     debug = False
     json_allowed_modules = [r"openglider\..*"]
     json_forbidden_modules = [r".*eval", r".*subprocess.*"]
@@ -27,32 +27,53 @@ from openglider.vector.interpolate import Interpolation
 
 
 class ArcSinc:
-    def __init__(self):
-        self.start = 0.
-        self.end = np.pi
-        self.arsinc = None
+    """
+    Inverse of sinc(phi) = sin(phi)/phi for phi in [0, pi].
+    Solved with a newton iteration that falls back to bisection,
+    the absolute accuracy (radians) is config["asinc_tolerance"].
+    """
+    max_iterations = 100
 
     def __call__(self, val):
-        if self.arsinc is None:
-            self.interpolate(openglider.config['asinc_interpolation_points'])
-        return self.arsinc(val)
+        values = np.asarray(val, dtype=float)
+        phi = np.where(values <= 0, np.pi, 0.)
+        phi = np.where(np.isnan(values), np.nan, phi)
 
-    def interpolate(self, numpoints):
-        data = []
+        todo = (0 < values) & (values < 1)
+        if np.any(todo):
+            phi[todo] = self.solve(values[todo], openglider.config["asinc_tolerance"])
 
-        for i in range(numpoints + 1):
-            phi = self.end + (i * 1. / numpoints) * (self.start - self.end)  # reverse for interpolation (increasing x_values)
-            data.append([np.sinc(phi / np.pi), phi])
+        if phi.ndim == 0:
+            return phi[()]
+        return phi
 
-        self.arsinc = Interpolation(data)
+    def solve(self, values, tolerance):
+        lower = np.zeros(values.shape)
+        upper = np.full(values.shape, np.pi)
+        # sinc(phi) ~ 1 - phi**2/6 for small angles (always < pi)
+        phi = np.sqrt(6 * (1 - values))
 
-    @property
-    def numpoints(self):
-        return len(self.arsinc.data)
+        for _ in range(self.max_iterations):
+            sin = np.sin(phi)
+            residual = sin / phi - values
+            derivative = (phi * np.cos(phi) - sin) / phi**2
 
-    @numpoints.setter
-    def numpoints(self, numpoints):
-        self.interpolate(numpoints)
+            # sinc is decreasing: keep the bracket around the solution
+            too_small = residual > 0
+            lower = np.where(too_small, phi, lower)
+            upper = np.where(too_small, upper, phi)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                phi_new = phi - residual / derivative
+            outside = ~((lower <= phi_new) & (phi_new <= upper))
+            phi_new[outside] = (lower[outside] + upper[outside]) / 2
+
+            converged = np.all((np.abs(phi_new - phi) <= tolerance) | (upper - lower <= tolerance))
+            phi = phi_new
+            if converged:
+                break
+
+        return phi
 
 
 class Ballooning(object):
@@ -67,7 +88,10 @@ class Ballooning(object):
                 'f_lower': self.lower}
 
     def __getitem__(self, xval):
-        """Get Ballooning Value (%) for a certain XValue"""
+        """Get Ballooning Value (%) for a certain XValue (or an array of XValues)"""
+        if np.ndim(xval) > 0:
+            return self.get_values(xval)
+
         if -1 <= xval < 0:
             #return self.upper.xpoint(-xval)[1]
             return self.upper(-xval)
@@ -77,6 +101,26 @@ class Ballooning(object):
         else:
             raise ValueError("Value {} not between -1 and 1".format(xval))
 
+    def get_values(self, xvals):
+        """Get Ballooning Values (%) for an array of XValues"""
+        xvals = np.asarray(xvals, dtype=float)
+        if np.any((xvals < -1) | (xvals > 1)):
+            raise ValueError("Values {} not between -1 and 1".format(xvals))
+
+        upper = xvals < 0
+        values = np.empty(xvals.shape)
+        values[upper] = self.upper(-xvals[upper])
+        values[~upper] = self.lower(xvals[~upper])
+        return values
+
+    def phi_array(self, xvals):
+        """Get Ballooning Arcs (phi) for an array of XValues, 0 where there is no ballooning"""
+        values = self.get_values(xvals)
+        phi = np.zeros(values.shape)
+        inflated = values > 0
+        phi[inflated] = self.arcsinc(1. / (1 + values[inflated]))
+        return phi
+
     def __call__(self, xval):
         """Get Ballooning Arc (phi) for a certain XValue"""
         return self.phi(1. / (self[xval] + 1))
@@ -92,20 +136,15 @@ class Ballooning(object):
 
     def __add__(self, other):
         """Add another Ballooning to this one, needed for merging purposes"""
-        upper = []
-        for point in self.upper.data:
-            upper.append([point[0], point[1]+other.upper(point[0])])
-        lower = []
-        for point in self.lower.data:
-            lower.append([point[0], point[1]+other.lower(point[0])])
+        upper = np.array(self.upper.data)
+        upper[:, 1] += other.upper(upper[:, 0])
+        lower = np.array(self.lower.data)
+        lower[:, 1] += other.lower(lower[:, 0])
 
         return Ballooning(Interpolation(upper), Interpolation(lower))
 
     def __imul__(self, val):
-        for point in self.upper.data:
-            point[1] *= val
-        for point in self.lower.data:
-            point[1] *= val
+        self.scale(val)
         return self
 
     def __mul__(self, value):
@@ -126,7 +165,7 @@ class Ballooning(object):
         return cls.arcsinc(baloon)
 
     def mapx(self, xvals):
-        return [self[i] for i in xvals]
+        return list(self.get_values(xvals))
 
     @property
     def amount_maximal(self):
@@ -256,12 +295,22 @@ class BallooningBezierNeu(Ballooning):
         return {"spline": self.spline_curve.controlpoints}
 
     def __getitem__(self, xval):
-        """Get Ballooning Value (%) for a certain XValue"""
+        """Get Ballooning Value (%) for a certain XValue (or an array of XValues)"""
+        if np.ndim(xval) > 0:
+            return self.get_values(xval)
+
         if -1 <= xval <= 1:
             return self.upper(xval)
         else:
             raise ValueError("Value {} not between -1 and 1".format(xval))
 
+    def get_values(self, xvals):
+        xvals = np.asarray(xvals, dtype=float)
+        if np.any((xvals < -1) | (xvals > 1)):
+            raise ValueError("Values {} not between -1 and 1".format(xvals))
+
+        return self.upper(xvals)
+
     @classmethod
     def from_classic(cls, ballooning, numpoints=14):
         upper = ballooning.upper.data
@@ -307,19 +356,14 @@ class BallooningBezierNeu(Ballooning):
         return self
 
     def __add__(self, other):
-        upper = []
-        lower = []
-        for point in self.upper.data:
-            x, y = point
-            if x <= 0:
-                upper.append([-x, y+other[x]])
-
-            if x >= 0:
-                lower.append([x, y+other[x]])
-
-        p0 = [0, self[0]+other[0]]
-        upper.append(p0)
-        lower.insert(0, p0)
+        x_values, y_values = np.array(self.upper.data).T
+        y_values += other.get_values(x_values)
+        upper = np.array([-x_values, y_values]).T[x_values <= 0]
+        lower = np.array([x_values, y_values]).T[x_values >= 0]
+
+        p0 = [[0, self[0]+other[0]]]
+        upper = np.concatenate([upper, p0])
+        lower = np.concatenate([p0, lower])
 
         return Ballooning(Interpolation(upper[::-1]), Interpolation(lower))
 
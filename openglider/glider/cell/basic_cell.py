@@ -69,6 +69,37 @@ class BasicCell(CachedObject):
 
             return Profile3D(midrib)
 
+    def get_midribs_array(self, y_values, ballooning=True):
+        """
+        Get multiple midribs at once
+        :param y_values: list of spanwise positions [0-1]
+        :param ballooning: calculate ballooned midribs
+        :return: ndarray (len(y_values), numpoints, 3)
+        """
+        y_values = np.asarray(y_values, dtype=float)[:, np.newaxis, np.newaxis]
+        prof1 = self.prof1.data
+        prof2 = self.prof2.data
+        diff = prof1 - prof2
+
+        if ballooning and len(self.ballooning_phi) > 0:
+            phi = np.array(self.ballooning_phi)
+            radius = self.ballooning_radius
+            radius = (radius * (radius > 0.))[:, np.newaxis]
+
+            phi = (phi + (1e-10 - phi) * (phi <= 0.))[:, np.newaxis]
+            psi = phi * 2 * y_values
+            h = np.cos(phi - psi) - np.cos(phi)
+            d = 0.5 * (1 - np.sin(phi - psi) / np.sin(phi))
+            midribs = prof1 - d * diff + h * radius * self.normvectors
+        else:
+            midribs = prof1 - y_values * diff
+
+        # exact values at the borders
+        midribs[y_values[:, 0, 0] == 0] = prof1
+        midribs[y_values[:, 0, 0] == 1] = prof2
+
+        return midribs
+
     @cached_property('prof1', 'prof2')
     def normvectors(self, j=None):
         prof1 = self.prof1.data
@@ -2,14 +2,14 @@ from __future__ import division
 
 import logging
 import copy
-import math
 import numpy as np
 
 from openglider.airfoil import Profile3D
 from openglider.glider.ballooning import Ballooning
 from openglider.glider.cell import BasicCell
 from openglider.utils import consistent_value, linspace
-from openglider.utils.cache import CachedObject, cached_property, HashedList
+from openglider.utils.cache import CachedObject, cached_property, cached_function, HashedList
+from openglider.utils.instrumentation import timed
 from openglider.vector import norm, normalize, PolyLine2D
 from openglider.mesh import Mesh, Vertex, Polygon
 import openglider.vector.projection
@@ -140,22 +140,20 @@ class Cell(CachedObject):
         if not self.miniribs:
             return cells
 
-        for index, xvalue in enumerate(self.x_values):
-            left_point = self.rib1.profile_3d.data[index]
-            right_point = self.rib2.profile_3d.data[index]
-            bl = self.ballooning[xvalue]
-
-            l = norm(right_point - left_point)  # L
-            lnew = sum([norm(c.prof1.data[index] - c.prof2.data[index]) for c in cells])  # L-NEW
-
-            for c in cells:
-                if bl > 0:
-                    newval = l / lnew * (bl+1/2) - 1/2
-                    #newval = l/lnew / bl
-                    #newval = lnew / l / bl if bl != 0 else 1
-                    c.ballooning_phi.append(Ballooning.arcsinc(1/(1+newval)))  # B/L NEW 1 / (bl * l / lnew)
-                else:
-                    c.ballooning_phi.append(0.)
+        bl = self.ballooning.get_values(self.x_values)
+        l = np.linalg.norm(self.rib2.profile_3d.data - self.rib1.profile_3d.data, axis=1)  # L
+        lnew = sum(np.linalg.norm(c.prof1.data - c.prof2.data, axis=1) for c in cells)  # L-NEW
+
+        phi = np.zeros(len(bl))
+        inflated = bl > 0
+        newval = l[inflated] / lnew[inflated] * (bl[inflated]+1/2) - 1/2
+        #newval = l/lnew / bl
+        #newval = lnew / l / bl if bl != 0 else 1
+        phi[inflated] = Ballooning.arcsinc(1/(1+newval))  # B/L NEW 1 / (bl * l / lnew)
+
+        for c in cells:
+            # every cell gets its own array
+            c.ballooning_phi = HashedList(phi.copy())
         return cells
 
     @property
@@ -181,6 +179,7 @@ class Cell(CachedObject):
     def point(self, y=0, i=0, k=0):
         return self.midrib(y).point(i, k)
 
+    @timed()
     def midrib(self, y, ballooning=True, arc_argument=True, with_numpy=False):
         if len(self._child_cells) == 1:
             return self.basic_cell.midrib(y, ballooning=ballooning, with_numpy=with_numpy)
@@ -196,7 +195,32 @@ class Cell(CachedObject):
 
     def get_midribs(self, numribs):
         y_values = linspace(0, 1, numribs)
-        return [self.midrib(y) for y in y_values]
+        return [Profile3D(rib) for rib in self.get_midribs_array(y_values)]
+
+    def get_midribs_array(self, y_values, ballooning=True):
+        """
+        Get multiple midribs (including miniribs) in one pass
+        :param y_values: list of spanwise positions [0-1]
+        :param ballooning: calculate ballooned midribs
+        :return: ndarray (len(y_values), numpoints, 3)
+        """
+        y_values = np.asarray(y_values, dtype=float)
+
+        if len(self._child_cells) == 1 or not ballooning:
+            return self.basic_cell.get_midribs_array(y_values, ballooning=ballooning)
+
+        y_borders = np.array(self._yvalues, dtype=float)
+        cell_indices = np.searchsorted(y_borders, y_values, side="left") - 1
+        cell_indices = np.clip(cell_indices, 0, len(self._child_cells) - 1)
+
+        midribs = np.empty((len(y_values), len(self.prof1.data), 3))
+        for index in np.unique(cell_indices):
+            selection = cell_indices == index
+            y_left, y_right = y_borders[index], y_borders[index+1]
+            y_new = (y_values[selection] - y_left) / (y_right - y_left)
+            midribs[selection] = self._child_cells[index].get_midribs_array(y_new)
+
+        return midribs
 
     def get_spline(self, numribs, u_poles=20, v_poles=4, u_degree=3, v_degree=3):
         try:
@@ -237,8 +261,7 @@ class Cell(CachedObject):
     @cached_property('ballooning', 'rib1.profile_2d.numpoints', 'rib2.profile_2d.numpoints')
     def ballooning_phi(self):
         x_values = self.rib1.profile_2d.x_values
-        balloon = [self.ballooning[i] for i in x_values]
-        return HashedList([Ballooning.arcsinc(1. / (1+bal)) if bal > 0 else 0 for bal in balloon])
+        return HashedList(self.ballooning.phi_array(x_values))
 
     @property
     def ribs(self):
@@ -318,9 +341,8 @@ class Cell(CachedObject):
         rib_indices = range(numribs + 1)
         if half_cell:
             rib_indices = rib_indices[(numribs) // 2:]
-        for rib_no in rib_indices:
-            y = rib_no / max(numribs, 1)
-            rib = self.midrib(y, with_numpy=with_numpy).data
+        y_values = [rib_no / max(numribs, 1) for rib_no in rib_indices]
+        for rib in self.get_midribs_array(y_values):
             ribs.append(Vertex.from_vertices_list(rib[:-1]))
 
         quads = []
@@ -374,80 +396,61 @@ class Cell(CachedObject):
                     {self.rib1.name: ribs[0], self.rib2.name: ribs[-1]})
         return mesh
 
+    @cached_function('rib1.profile_3d', 'rib2.profile_3d', 'ballooning_phi', 'miniribs')
     def get_flattened_cell(self, numribs=50):
-        midribs = self.get_midribs(numribs)
-        numpoints = len(midribs[0])
-
-        len_dct = {}
-        def get_length(ik1, ik2):
-            index_str = f"{ik1}:{ik2}"
-            if index_str not in len_dct:
-                points = []
-                for i, rib in enumerate(midribs):
-                    x = ik1 + i/(numribs-1) * (ik2-ik1)
-                    points.append(rib[x])
-                
-                line = openglider.vector.PolyLine(points)
-
-                len_dct[index_str] = line.get_length()
-
-            return len_dct[index_str]
-
-        l_0 = get_length(0, 0)
-
-        left_bal = [np.array([0, 0])]
-        right_bal = [np.array([l_0, 0])]
-
-        def get_point(p1, p2, l_0, l_l, l_r, left=True):
-            lx = (l_0**2 + l_l**2 - l_r**2) / (2*l_0)
-            ly_sq = l_l**2 - lx**2
-            if ly_sq > 0:
-                ly = math.sqrt(ly_sq)
-            else:
-                ly = 0
-            diff = openglider.vector.normalize(p2 - p1)
-            if left:
-                diff_y = diff.dot([[0, 1], [-1, 0]])
-            else:
-                diff_y = diff.dot([[0, -1], [1, 0]])
-
-            return p1 + lx * diff + ly * diff_y
-
-
-        for i in range(numpoints-1):
-            p1 = left_bal[-1]
-            p2 = right_bal[-1]
-
-
-            d_l = openglider.vector.norm(midribs[0][i] - midribs[0][i+1])
-            d_r = openglider.vector.norm(midribs[-1][i] - midribs[-1][i+1])
-            l_0 = get_length(i, i)
-
-            if False:
-                pl_2 = get_point(p1, p2, l_0, d_l, get_length(i+1, i))
-                pr_2 = get_point(p2, pl_2, get_length(i+1, i), d_r, get_length(i+1, i+1), left=False)
-            else:
-                pr_2 = get_point(p2, p1, l_0, d_r, get_length(i, i+1), left=False)
-                pl_2 = get_point(p1, pr_2, get_length(i, i+1), d_l, get_length(i+1, i+1))
-
-            left_bal.append(pl_2)
-            right_bal.append(pr_2)
-            #right_bal.append(get_point(p2, p1, l_0, d_r, get_length(i, i+1), left=False))
+        """
+        Flatten the ballooned cell (cached per numribs, shared by all panels).
+        The result must not be modified.
+        :return: {"midribs": [Profile3D], "inner": [PolyLine2D], "ballooned": [left, right]}
+        """
+        y_values = linspace(0, 1, numribs)
+        midribs_array = self.get_midribs_array(y_values)
+        midribs = [Profile3D(rib) for rib in midribs_array]
+
+        # length along the cell-surface between the same point of both ribs (rib_lengths[i])
+        # and between point i of the left and point i+1 of the right rib (diagonal_lengths[i])
+        t = np.array(y_values)[:, np.newaxis, np.newaxis]
+        diagonals = midribs_array[:, :-1] + t * (midribs_array[:, 1:] - midribs_array[:, :-1])
+        rib_lengths = np.linalg.norm(np.diff(midribs_array, axis=0), axis=2).sum(axis=0)
+        diagonal_lengths = np.linalg.norm(np.diff(diagonals, axis=0), axis=2).sum(axis=0)
+
+        # segment lengths of the outer ribs
+        d_l = np.linalg.norm(np.diff(midribs_array[0], axis=0), axis=1)
+        d_r = np.linalg.norm(np.diff(midribs_array[-1], axis=0), axis=1)
+
+        # unfold the triangles (law of cosines) in local coordinates (complex numbers):
+        # right_(i+1) - left_i relative to the (normalized) rung left_i -> right_i
+        l_0 = rib_lengths[:-1]
+        lx = (l_0**2 + d_r**2 - diagonal_lengths**2) / (2*l_0)
+        ly = np.sqrt(np.maximum(d_r**2 - lx**2, 0))
+        diagonal = l_0 - (lx - 1j*ly)
+
+        # left_(i+1) - left_i relative to the (normalized) diagonal left_i -> right_(i+1)
+        lx = (diagonal_lengths**2 + d_l**2 - rib_lengths[1:]**2) / (2*diagonal_lengths)
+        ly = np.sqrt(np.maximum(d_l**2 - lx**2, 0))
+        left_step = lx + 1j*ly
+
+        # rung-directions are accumulated rotations
+        diagonal_direction = diagonal / np.abs(diagonal)
+        rung = np.abs(diagonal) - left_step
+        rung_direction = np.cumprod(np.concatenate([[1], diagonal_direction * rung / np.abs(rung)]))[:-1]
+
+        left = np.concatenate([[0], np.cumsum(rung_direction * diagonal_direction * left_step)])
+        right = np.concatenate([[rib_lengths[0]], left[:-1] + rung_direction * diagonal])
+
+        left = np.array([left.real, left.imag]).T
+        right = np.array([right.real, right.imag]).T
 
         ballooned = [
-            PolyLine2D(left_bal),
-            PolyLine2D(right_bal)
+            PolyLine2D(left),
+            PolyLine2D(right)
         ]
 
-        inner = []
-        for x in openglider.utils.linspace(0, 1, numribs + 2):
-            l1 = ballooned[0] * (1-x)
-            l2 = ballooned[1] * x
-            inner.append(l1.add(l2))
-
-        #ballooned = [left_bal, right_bal]
+        x = np.array(linspace(0, 1, numribs + 2))[:, np.newaxis, np.newaxis]
+        inner = [PolyLine2D(line) for line in left * (1 - x) + right * x]
 
         return {
+            "midribs": midribs,
             "inner": inner,
             "ballooned": ballooned
             }
@@ -388,7 +388,7 @@ class Panel(object):
         Get Panel-mesh
         :param cell: the parent cell of the panel
         :param numribs: number of interpolation steps between ribs
-        :param with_numpy: compute midribs with numpy (faster if available)
+        :param with_numpy: unused, the midribs are always computed with numpy
         :return: mesh objects consisting of triangles and quadrangles
         """
         numribs += 1
@@ -398,8 +398,9 @@ class Panel(object):
         points = []
         nums = []
         count = 0
-        for rib_no in range(numribs + 1):
-            y = rib_no / max(numribs, 1)
+        y_values = [rib_no / max(numribs, 1) for rib_no in range(numribs + 1)]
+        for y, midrib in zip(y_values, cell.get_midribs_array(y_values)):
+            midrib = PolyLine(midrib)
             x1 = self.cut_front["left"] + y * (self.cut_front["right"] -
                                                self.cut_front["left"])
             front = get_x_value(xvalues, x1)
@@ -407,7 +408,6 @@ class Panel(object):
             x2 = self.cut_back["left"] + y * (self.cut_back["right"] -
                                               self.cut_back["left"])
             back = get_x_value(xvalues, x2)
-            midrib = cell.midrib(y, with_numpy=with_numpy)
             ribs.append([x for x in midrib.get_positions(front, back)])
             points += list(midrib[front:back])
             nums.append([i + count for i, _ in enumerate(ribs[-1])])
@@ -541,7 +541,7 @@ class Panel(object):
         """
         numribs = len(inner_2d) - 2
         if midribs is None or len(midribs) != len(inner_2d):
-            midribs = cell.get_midribs(numribs)
+            midribs = cell.get_flattened_cell(numribs)["midribs"]
 
         ribs = [cell.prof1] + midribs + [cell.prof2]
 
@@ -26,9 +26,10 @@ import numpy as np
 
 from openglider.glider.in_out import IMPORT_GEOMETRY, EXPORT_3D
 from openglider.glider.shape import Shape
-from openglider.mesh import Mesh
+from openglider.mesh import Mesh, ArrayMesh
 from openglider.utils import consistent_value
 from openglider.utils.distribution import Distribution
+from openglider.utils.instrumentation import timed
 from openglider.vector.functions import norm, rotation_2d
 from openglider.vector.projection import flatten_list
 from openglider.lines.lineset import LineSet
@@ -42,22 +43,42 @@ class Glider(object):
         self.lineset = lineset
 
     def __json__(self):
-        new = self.copy()
-        ribs = new.ribs[:]
+        ribs = self.ribs
         # de-reference Ribs not to store too much data
-        for cell in new.cells:
-            cell.rib1 = ribs.index(cell.rib1)
-            cell.rib2 = ribs.index(cell.rib2)
+        # (on shallow copies, nothing else has to be copied for serialization)
+        rib_indices = {id(rib): index for index, rib in enumerate(ribs)}
+        cell_indices = {id(cell): index for index, cell in enumerate(self.cells)}
 
-        for att_point in new.lineset.attachment_points:
+        cells = []
+        for cell in self.cells:
+            cell = copy.copy(cell)
+            cell.rib1 = rib_indices[id(cell.rib1)]
+            cell.rib2 = rib_indices[id(cell.rib2)]
+            cells.append(cell)
+
+        attachment_points = {}
+        for att_point in self.lineset.attachment_points:
+            new_point = copy.copy(att_point)
             if hasattr(att_point, "rib"):
-                att_point.rib = ribs.index(att_point.rib)
+                new_point.rib = rib_indices[id(att_point.rib)]
             if hasattr(att_point, "cell"):
-                att_point.cell = new.cells.index(att_point.cell)
+                new_point.cell = cell_indices[id(att_point.cell)]
+            attachment_points[id(att_point)] = new_point
+
+        lines = []
+        for line in self.lineset.lines:
+            line = copy.copy(line)
+            line.lineset = None
+            line.upper_node = attachment_points.get(id(line.upper_node), line.upper_node)
+            line.lower_node = attachment_points.get(id(line.lower_node), line.lower_node)
+            lines.append(line)
 
-        return {"cells": new.cells,
+        lineset = copy.copy(self.lineset)
+        lineset.lines = lines
+
+        return {"cells": cells,
                 "ribs": ribs,
-                "lineset": new.lineset
+                "lineset": lineset
                 }
 
     @classmethod
@@ -108,9 +129,12 @@ class Glider(object):
         IMPORT_GEOMETRY[filetype](path, glider=glider)
         return glider
 
-    def export_3d(self, path="", *args, **kwargs):
-        # todo: fix
-        filetype = path.split(".")[-1]
+    def export_3d(self, path="", *args, filetype=None, **kwargs):
+        """
+        Export the 3d-geometry, the format is chosen by filetype or the file-extension:
+        obj, ply (binary=True), stl (binary), dxf, inp (apame), json (panelmethod)
+        """
+        filetype = filetype or path.split(".")[-1]
         return EXPORT_3D[filetype](self, path, *args, **kwargs)
 
     def rename_parts(self):
@@ -132,7 +156,26 @@ class Glider(object):
 
         return panels
 
+    @timed()
     def get_mesh(self, midribs=0):
+        mesh = self._get_mesh_elements(midribs)
+        mesh += self.get_mesh_hull(midribs)
+
+        return mesh
+
+    def get_array_mesh(self, midribs=0):
+        """
+        Same as get_mesh, but as ArrayMesh (the hull is created from arrays directly)
+        """
+        mesh = ArrayMesh.from_mesh(self._get_mesh_elements(midribs))
+        mesh += self.get_array_mesh_hull(midribs)
+
+        return mesh
+
+    def _get_mesh_elements(self, midribs=0):
+        """
+        Mesh of ribs, diagonals, lines and panels (everything except the hull)
+        """
         mesh = Mesh()
         for rib in self.ribs:
             if not rib.profile_2d.has_zero_thickness:
@@ -144,7 +187,6 @@ class Glider(object):
 
         mesh += self.lineset.get_mesh()
         mesh += self.get_mesh_panels(num_midribs=midribs)
-        mesh += self.get_mesh_hull(midribs)
 
         return mesh
 
@@ -157,49 +199,46 @@ class Glider(object):
         return mesh
 
     def get_mesh_hull(self, num_midribs=0, ballooning=True):
+        return self.get_array_mesh_hull(num_midribs, ballooning).to_mesh()
+
+    def get_array_mesh_hull(self, num_midribs=0, ballooning=True):
         ribs = self.return_ribs(num=num_midribs, ballooning=ballooning)
 
         num = len(ribs)
         numpoints = len(ribs[0])  # points per rib
 
-        polygons = []
+        rib_indices = np.arange(num-1)[:, np.newaxis] * numpoints  # because we use i+1 below
+        k = np.arange(numpoints - 1)
+        kplus = (k+1) % (numpoints-1)
+        polygons = np.stack([
+            rib_indices + k,
+            rib_indices + kplus,
+            rib_indices + numpoints + kplus,
+            rib_indices + numpoints + k
+        ], axis=-1).reshape(-1, 4)
+
         boundary = {
-            "ribs": [],
-            "trailing_edge": []
+            "ribs": (rib_indices[::num_midribs+1] + k).flatten(),
+            "trailing_edge": rib_indices.flatten()
         }
-        for i in range(num-1):  # because we use i+1 below
-            boundary["trailing_edge"].append(i*numpoints)
-            if not i % (num_midribs+1):
-                boundary["ribs"] += [i*numpoints+k for k in range(numpoints-1)]
-
-            for k in range(numpoints - 1):  # same reason as above
-                kplus = (k+1) % (numpoints-1)
-                polygons.append([
-                    i * numpoints + k,
-                    i * numpoints + kplus,
-                    (i + 1) * numpoints + kplus,
-                    (i + 1) * numpoints + k
-                ])
-
-        return Mesh.from_indexed(np.concatenate(ribs), {"hull": polygons}, boundary)
+
+        return ArrayMesh(ribs.reshape(-1, 3), {"hull": polygons}, boundary)
 
     def return_ribs(self, num=0, ballooning=True):
         """
         Get a list of rib-curves
         :param num: number of midribs per cell
         :param ballooning: calculate ballooned cells
-        :return: nested list of ribs [[[x,y,z],p2,p3...],rib2,rib3,..]
+        :return: array of ribs [[[x,y,z],p2,p3...],rib2,rib3,..]
         """
         num += 1
         if not self.cells:
             return np.array([])
+        y_values = np.arange(num) / num
         #will hold all the points
-        ribs = []
-        for cell in self.cells:
-            for y in range(num):
-                ribs.append(cell.midrib(y * 1. / num, ballooning=ballooning).data)
-        ribs.append(self.cells[-1].midrib(1.).data)
-        return ribs
+        ribs = [cell.get_midribs_array(y_values, ballooning=ballooning) for cell in self.cells]
+        ribs.append(self.cells[-1].get_midribs_array([1.]))
+        return np.concatenate(ribs)
 
     def apply_mean_ribs(self, num_mean=8):
         """
@@ -258,6 +297,10 @@ class Glider(object):
         self.cells = self.cells[::-1]
 
     def copy(self):
+        """
+        Deep copy, the (numpy-) data of profiles and splines is shared copy-on-write
+        (read-only for both gliders, see HashedList)
+        """
         return copy.deepcopy(self)
 
     def copy_complete(self):
@@ -27,6 +27,8 @@ IMPORT_GEOMETRY = {
 
 EXPORT_3D = {
     'obj': export_3d.export_obj,
+    'ply': export_3d.export_ply,
+    'stl': export_3d.export_stl,
     'dxf': export_3d.export_dxf,
     'inp': export_3d.export_apame,
     'json': export_3d.export_json
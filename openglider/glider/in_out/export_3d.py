@@ -6,13 +6,27 @@ from openglider.vector.functions import norm, normalize
 from openglider.utils.distribution import Distribution
 
 
-def export_obj(glider, path, midribs=0, numpoints=None, floatnum=6, copy=True):
+def _get_array_mesh(glider, midribs=0, numpoints=None, copy=True):
     other = glider.copy_complete() if copy else glider
     if numpoints:
         other.profile_numpoints = numpoints
 
-    mesh = other.get_mesh(midribs=midribs)
-    mesh.export_obj(path)
+    return other.get_array_mesh(midribs=midribs)
+
+
+def export_obj(glider, path, midribs=0, numpoints=None, floatnum=6, copy=True):
+    mesh = _get_array_mesh(glider, midribs, numpoints, copy)
+    return mesh.export_obj(path)
+
+
+def export_ply(glider, path, midribs=0, numpoints=None, binary=True, copy=True):
+    mesh = _get_array_mesh(glider, midribs, numpoints, copy)
+    return mesh.export_ply(path, binary=binary)
+
+
+def export_stl(glider, path, midribs=0, numpoints=None, copy=True):
+    mesh = _get_array_mesh(glider, midribs, numpoints, copy)
+    return mesh.export_stl(path)
 
 
 
@@ -1,6 +1,7 @@
 import copy
 import numpy as np
 
+from openglider.utils.cache import cached_property, cached_function
 from openglider.vector import PolyLine2D
 from openglider.vector.spline import SymmetricBezier, SymmetricBSpline
 
@@ -24,6 +25,22 @@ class ArcCurve(object):
     def has_center_cell(x_values):
         return x_values[0] != 0
 
+    @cached_property('curve', 'num_interpolation_points')
+    def _arc_curve(self):
+        # Symmetric-Bezier-> start from 0.5
+        return PolyLine2D(self.curve(np.linspace(0.5, 1, self.num_interpolation_points)))
+
+    @cached_function('curve', 'num_interpolation_points')
+    def _get_arc_positions(self, x_values):
+        arc_curve = self._arc_curve
+        scale_factor = arc_curve.get_length() / x_values[-1]
+        iks = arc_curve.extend_array(0, np.array(x_values) * scale_factor)
+        positions = arc_curve.get_points(iks)
+        if not self.has_center_cell(x_values):
+            positions[0, 0] = 0
+        positions.flags.writeable = False
+        return positions
+
     def get_arc_positions(self, x_values):
         """
         calculate y/z positions vor the arc-curve, given a shape's rib-x-values
@@ -31,16 +48,7 @@ class ArcCurve(object):
         :param x_values:
         :return: [p0, p1,...]
         """
-        # Symmetric-Bezier-> start from 0.5
-        arc_curve = PolyLine2D([self.curve(i) for i in np.linspace(0.5, 1, self.num_interpolation_points)])
-        arc_curve_length = arc_curve.get_length()
-        scale_factor = arc_curve_length / x_values[-1]
-        _positions = [arc_curve.extend(0, x * scale_factor) for x in x_values]
-        positions = PolyLine2D([arc_curve[p] for p in _positions])
-        if not self.has_center_cell(x_values):
-            positions[0][0] = 0
-        # rescale
-        return positions
+        return PolyLine2D(self._get_arc_positions(tuple(x_values)))
 
     def get_cell_angles(self, x_values, rad=True):
         """
@@ -48,23 +56,19 @@ class ArcCurve(object):
         :param x_values:
         :return: [rib_angles]
         """
-        arc_positions = self.get_arc_positions(x_values)
-        arc_positions_lst = list(arc_positions)
+        arc_positions = self._get_arc_positions(tuple(x_values))
         cell_angles = []
 
         if self.has_center_cell(x_values):
             # center cell is always straight
             cell_angles.append(0)
 
-        for l, r in zip(arc_positions_lst[:-1], arc_positions_lst[1:]):
-            d = r - l
-            angle = np.arctan2(-d[1], d[0])
-            if rad:
-                cell_angles.append(angle)
-            else:
-                cell_angles.append(angle * 180 / np.pi)
+        d = np.diff(arc_positions, axis=0)
+        angles = np.arctan2(-d[:, 1], d[:, 0])
+        if not rad:
+            angles = angles * 180 / np.pi
 
-        return cell_angles
+        return cell_angles + angles.tolist()
 
     @classmethod
     def from_cell_angles(cls, angles, x_values, rad=True):
@@ -115,12 +119,13 @@ class ArcCurve(object):
         p1, p2 = self.curve.get_sequence(2)
 
     def rescale(self, x_values):
+        """
+        Move the center to the origin and scale the arc length to the span,
+        the curve isn't modified if it's already scaled (keeps the caches)
+        """
         positions = self.get_arc_positions(x_values)
-        diff = [0, -positions[0][1]]
-        self.curve.controlpoints = [p + diff for p in self.curve.controlpoints]
-
-        arc_curve = PolyLine2D([self.curve(i) for i in np.linspace(0.5, 1, self.num_interpolation_points)])
-        arc_curve_length = arc_curve.get_length()
-        scale_factor = x_values[-1] / arc_curve_length
+        shift = -positions[0][1]
+        scale_factor = x_values[-1] / self._arc_curve.get_length()
 
-        self.curve.controlpoints = [p * scale_factor for p in self.curve.controlpoints]
\ No newline at end of file
+        if abs(shift) > 1e-12 or abs(scale_factor - 1) > 1e-12:
+            self.curve.controlpoints = [(p + [0, shift]) * scale_factor for p in self.curve.controlpoints]
@@ -13,12 +13,37 @@ from openglider.glider.parametric.export_ods import export_ods_2d
 from openglider.glider.parametric.import_ods import import_ods_2d
 from openglider.glider.parametric.lines import LineSet2D, UpperNode2D
 from openglider.glider.rib import RibHole, RigidFoil, Rib, MiniRib
+from openglider.glider.rib.elements import CellAttachmentPoint
 from openglider.glider.parametric.fitglider import fit_glider_3d
 from openglider.utils.distribution import Distribution
+from openglider.utils.instrumentation import timed
 from openglider.utils.table import Table
 from openglider.utils import ZipCmp
 
 
+def _get_state(obj):
+    """
+    Hashable snapshot of plain (nested) values: dicts, lists, arrays, numbers, strings.
+    Other objects are taken as they are (hashed by identity).
+    """
+    if isinstance(obj, dict):
+        return tuple((key, _get_state(value)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(_get_state(value) for value in obj)
+    if isinstance(obj, np.ndarray):
+        return obj.shape, obj.tobytes()
+    return obj
+
+
+def _is_close(value_1, value_2):
+    """
+    Compare (nested tuples of) parametric values, ignoring the float noise of rescaling
+    """
+    if isinstance(value_1, (tuple, list)):
+        return len(value_1) == len(value_2) and all(_is_close(v1, v2) for v1, v2 in zip(value_1, value_2))
+    return np.allclose(value_1, value_2, rtol=1e-9, atol=1e-12)
+
+
 class ParametricGlider(object):
     """
     A parametric (2D) Glider object used for gui input
@@ -263,11 +288,11 @@ class ParametricGlider(object):
     def get_aoa(self, interpolation_num=None):
         aoa_interpolation = self.aoa.interpolation(num=interpolation_num or self.num_interpolate)
 
-        return [aoa_interpolation(x) for x in self.shape.rib_x_values]
+        return list(aoa_interpolation(self.shape.rib_x_values))
 
     def apply_aoa(self, glider, interpolation_num=50):
         aoa_interpolation = self.aoa.interpolation(num=interpolation_num)
-        aoa_values = [aoa_interpolation(x) for x in self.shape.rib_x_values]
+        aoa_values = list(aoa_interpolation(self.shape.rib_x_values))
 
         if self.shape.has_center_cell:
             aoa_values.insert(0, aoa_values[0])
@@ -277,11 +302,11 @@ class ParametricGlider(object):
 
     def get_profile_merge(self):
         profile_merge_curve = self.profile_merge_curve.interpolation(num=self.num_interpolate)
-        return [profile_merge_curve(abs(x)) for x in self.shape.rib_x_values]
+        return list(profile_merge_curve(np.abs(self.shape.rib_x_values)))
 
     def get_ballooning_merge(self):
         ballooning_merge_curve = self.ballooning_merge_curve.interpolation(num=self.num_interpolate)
-        return [ballooning_merge_curve(abs(x) for x in self.shape.cell_x_values)]
+        return list(ballooning_merge_curve(np.abs(self.shape.cell_x_values)))
 
     def apply_shape_and_arc(self, glider):
         x_values = self.shape.rib_x_values
@@ -308,88 +333,127 @@ class ParametricGlider(object):
             glider.ribs[rib_no].pos = p
             glider.ribs[rib_no].chord = chords[rib_no]
 
-    def get_glider_3d(self, glider=None, num=50, num_profile=None):
-        """returns a new glider from parametric values"""
-        glider = glider or Glider()
-        ribs = []
+    def _get_profile_x_values(self, num_profile=None):
+        if self.num_profile is not None:
+            num_profile = self.num_profile
 
-        self.rescale_curves()
+        if num_profile is not None:
+            return Distribution.from_cos_distribution(num_profile)
+        else:
+            return self.profiles[0].x_values
 
+    def _get_rib_parameters(self, num=50):
+        """
+        Get the parametric inputs of every (half-glider) rib
+        :return: [(startpoint, chord, arcang, aoa, zrot, glide, profile_factor), ...]
+        """
         x_values = self.shape.rib_x_values
         shape_ribs = self.shape.ribs
 
         profile_merge_curve = self.profile_merge_curve.interpolation(num=num)
-        ballooning_merge_curve = self.ballooning_merge_curve.interpolation(num=num)
         aoa_int = self.aoa.interpolation(num=num)
         zrot_int = self.zrot.interpolation(num=num)
 
         arc_pos = list(self.arc.get_arc_positions(x_values))
         rib_angles = self.arc.get_rib_angles(x_values)
+        offset_x = shape_ribs[0][0][1]
 
-        if self.num_profile is not None:
-            num_profile = self.num_profile
+        parameters = []
+        for rib_no, pos in enumerate(x_values):
+            front, back = shape_ribs[rib_no]
+            arc = arc_pos[rib_no]
+            startpoint = (-front[1] + offset_x, arc[0], arc[1])
+
+            parameters.append((
+                startpoint,
+                abs(front[1]-back[1]),
+                rib_angles[rib_no],
+                aoa_int(pos),
+                zrot_int(pos),
+                self.glide,
+                profile_merge_curve(abs(pos))
+            ))
 
-        if num_profile is not None:
-            profile_x_values = Distribution.from_cos_distribution(num_profile)
-        else:
-            profile_x_values = self.profiles[0].x_values
+        return parameters
 
-        rib_holes = self.elements.get("holes", [])
-        rigids = self.elements.get("rigidfoils", [])
+    def _get_ballooning_factors(self, num=50):
+        x_values = self.shape.rib_x_values
+        ballooning_merge_curve = self.ballooning_merge_curve.interpolation(num=num)
 
         cell_centers = [(p1+p2)/2 for p1, p2 in zip(x_values[:-1], x_values[1:])]
-        offset_x = shape_ribs[0][0][1]
+        if self.shape.has_center_cell:
+            cell_centers.insert(0, 0.)
 
-        rib_material = None
-        if "rib_material" in self.elements:
-            rib_material = self.elements["rib_material"]
+        return [ballooning_merge_curve(x) for x in cell_centers]
 
-        for rib_no, pos in enumerate(x_values):
-            front, back = shape_ribs[rib_no]
-            arc = arc_pos[rib_no]
-            startpoint = np.array([-front[1] + offset_x, arc[0], arc[1]])
+    def _get_rib_profile(self, rib_no, profile_factor, profile_x_values):
+        profile = self.get_merge_profile(profile_factor)
+        profile.name = "Profile{}".format(rib_no)
+        profile.x_values = profile_x_values
+        return profile
 
-            chord = abs(front[1]-back[1])
-            factor = profile_merge_curve(abs(pos))
-            profile = self.get_merge_profile(factor)
-            profile.name = "Profile{}".format(rib_no)
-            profile.x_values = profile_x_values
+    def _get_rib_elements(self, rib_no):
+        rib_holes = self.elements.get("holes", [])
+        rigids = self.elements.get("rigidfoils", [])
 
-            this_rib_holes = [RibHole(ribhole["pos"], ribhole["size"]) for ribhole in rib_holes if rib_no in ribhole["ribs"]]
-            this_rigid_foils = [RigidFoil(rigid["start"], rigid["end"], rigid["distance"]) for rigid in rigids if rib_no in rigid["ribs"]]
+        holes = [RibHole(ribhole["pos"], ribhole["size"]) for ribhole in rib_holes if rib_no in ribhole["ribs"]]
+        rigid_foils = [RigidFoil(rigid["start"], rigid["end"], rigid["distance"]) for rigid in rigids if rib_no in rigid["ribs"]]
 
-            ribs.append(Rib(
-                profile_2d=profile,
-                startpoint=startpoint,
-                chord=chord,
-                arcang=rib_angles[rib_no],
-                glide=self.glide,
-                aoa_absolute=aoa_int(pos),
-                zrot=zrot_int(pos),
-                holes=this_rib_holes,
-                rigidfoils=this_rigid_foils,
-                name="rib{}".format(rib_no),
-                material_code=rib_material
-            ))
-            ribs[-1].aoa_relative = aoa_int(pos)
+        return holes, rigid_foils
 
-        if self.shape.has_center_cell:
-            new_rib = ribs[0].copy()
-            new_rib.name = "rib0"
-            new_rib.mirror()
-            new_rib.mirrored_rib = ribs[0]
-            ribs.insert(0, new_rib)
-            cell_centers.insert(0, 0.)
+    @staticmethod
+    def _update_mirrored_rib(mirrored_rib, rib):
+        """
+        Set the values of the center rib (mirrored_rib) from its (changed) neighbour, see _get_mirrored_rib
+        """
+        mirrored_rib.profile_2d = rib.profile_2d.copy()
+        mirrored_rib.pos = np.multiply(rib.pos, [1, -1., 1])
+        mirrored_rib.chord = rib.chord
+        mirrored_rib.arcang = -rib.arcang
+        mirrored_rib.xrot = -rib.xrot
+        mirrored_rib.glide = rib.glide
+        mirrored_rib.zrot = rib.zrot
+        mirrored_rib.aoa_absolute = rib.aoa_absolute
+        mirrored_rib.holes = copy.deepcopy(rib.holes)
+        mirrored_rib.rigidfoils = copy.deepcopy(rib.rigidfoils)
+        mirrored_rib.material_code = rib.material_code
+        mirrored_rib.mirrored_rib = rib
+
+    @staticmethod
+    def _get_mirrored_rib(rib):
+        new_rib = rib.copy()
+        new_rib.name = "rib0"
+        new_rib.mirror()
+        new_rib.mirrored_rib = rib
+        return new_rib
+
+    def _get_build_state(self, rib_parameters, ballooning_factors, num_profile):
+        """
+        Snapshot of the parametric inputs, used by update_glider_3d to find the changes.
+        Profiles and balloonings are tracked by the versions of their (hashed) lists.
+        """
+        if self.num_profile is not None:
+            num_profile = self.num_profile
 
-        glider.cells = []
-        for cell_no, (rib1, rib2) in enumerate(zip(ribs[:-1], ribs[1:])):
-            ballooning_factor = ballooning_merge_curve(cell_centers[cell_no])
-            ballooning = self.merge_ballooning(ballooning_factor)
-            cell = Cell(rib1, rib2, ballooning, name="c{}".format(cell_no+1))
+        return {
+            "center_cell": self.shape.has_center_cell,
+            "rib_parameters": rib_parameters,
+            "ballooning_factors": ballooning_factors,
+            "profiles": (num_profile, [(id(profile), hash(profile)) for profile in self.profiles]),
+            "balloonings": [(id(ballooning), hash(ballooning.upper), hash(ballooning.lower))
+                            for ballooning in self.balloonings],
+            "elements": hash(_get_state(self.elements)),
+            "lineset": self._get_lineset_state()
+        }
 
-            glider.cells.append(cell)
+    def _get_lineset_state(self):
+        lines = [[vars(line), vars(line.upper_node), vars(line.lower_node)] for line in self.lineset.lines]
+        return hash((self.speed, self.glide, _get_state(lines)))
 
-        glider.close_rib()
+    def _apply_elements(self, glider):
+        for cell in glider.cells:
+            cell.panels = []
+            cell.miniribs = []
 
         # CELL-ELEMENTS
         self.get_panels(glider)
@@ -406,6 +470,7 @@ class ParametricGlider(object):
 
         glider.rename_parts()
 
+    def _apply_lineset(self, glider):
         glider.lineset = self.lineset.return_lineset(glider, self.v_inf)
         glider.lineset.glider = glider
         glider.lineset.calculate_sag = False
@@ -414,6 +479,176 @@ class ParametricGlider(object):
         glider.lineset.calculate_sag = True
         glider.lineset.recalc()
 
+    def _update_lineset(self, glider, ribs, cells):
+        """
+        Update the attachment points of the existing 3d lineset on the given (changed) ribs and cells
+        and recalculate the lineset once if any of them moved.
+        The 2d lineset has to be unchanged since the 3d lineset was created (return_lineset).
+        """
+        rib_ids = {id(rib) for rib in ribs}
+        cell_ids = {id(cell) for cell in cells}
+        updated = set()
+
+        for line in glider.lineset.lines:
+            node = line.upper_node
+            if node.type != 2 or id(node) in updated:
+                continue
+
+            if isinstance(node, CellAttachmentPoint):
+                cell = node.cell
+                changed = id(cell) in cell_ids or id(cell.rib1) in rib_ids or id(cell.rib2) in rib_ids
+            else:
+                changed = id(node.rib) in rib_ids
+
+            if changed:
+                # the direction of the force depends on the rib/cell
+                node_2d = self.lineset.lines[line.number].upper_node
+                node.force = node_2d.get_node(glider).force
+                updated.add(id(node))
+
+        if updated:
+            glider.lineset.recalc()
+
+    @timed()
+    def get_glider_3d(self, glider=None, num=50, num_profile=None):
+        """returns a new glider from parametric values"""
+        glider = glider or Glider()
+        ribs = []
+
+        self.rescale_curves()
+
+        rib_parameters = self._get_rib_parameters(num=num)
+        ballooning_factors = self._get_ballooning_factors(num=num)
+        profile_x_values = self._get_profile_x_values(num_profile)
+
+        rib_material = None
+        if "rib_material" in self.elements:
+            rib_material = self.elements["rib_material"]
+
+        for rib_no, parameters in enumerate(rib_parameters):
+            startpoint, chord, arcang, aoa, zrot, glide, profile_factor = parameters
+            this_rib_holes, this_rigid_foils = self._get_rib_elements(rib_no)
+
+            ribs.append(Rib(
+                profile_2d=self._get_rib_profile(rib_no, profile_factor, profile_x_values),
+                startpoint=np.array(startpoint),
+                chord=chord,
+                arcang=arcang,
+                glide=glide,
+                aoa_absolute=aoa,
+                zrot=zrot,
+                holes=this_rib_holes,
+                rigidfoils=this_rigid_foils,
+                name="rib{}".format(rib_no),
+                material_code=rib_material
+            ))
+            ribs[-1].aoa_relative = aoa
+
+        if self.shape.has_center_cell:
+            ribs.insert(0, self._get_mirrored_rib(ribs[0]))
+
+        glider.cells = []
+        for cell_no, (rib1, rib2) in enumerate(zip(ribs[:-1], ribs[1:])):
+            ballooning = self.merge_ballooning(ballooning_factors[cell_no])
+            cell = Cell(rib1, rib2, ballooning, name="c{}".format(cell_no+1))
+
+            glider.cells.append(cell)
+
+        glider.close_rib()
+
+        self._apply_elements(glider)
+        self._apply_lineset(glider)
+
+        glider.parametric_build = self._get_build_state(rib_parameters, ballooning_factors, num_profile)
+
+        return glider
+
+    def update_glider_3d(self, glider, num=50, num_profile=None):
+        """
+        Update a glider created by get_glider_3d. Only ribs and cells with changed
+        parametric inputs are recalculated; falls back to a full rebuild if the
+        layout (number of ribs, center cell) changed.
+        The lineset is only rebuilt if the 2d lineset changed; otherwise the attachment points
+        on changed ribs/cells are moved and the lineset is recalculated once, starting from
+        its previous state (line lengths match a new build within the convergence of the solver).
+        """
+        state = getattr(glider, "parametric_build", None)
+
+        self.rescale_curves()
+
+        rib_parameters = self._get_rib_parameters(num=num)
+        ballooning_factors = self._get_ballooning_factors(num=num)
+        profile_x_values = self._get_profile_x_values(num_profile)
+
+        if (state is None or
+                state["center_cell"] != self.shape.has_center_cell or
+                len(state["rib_parameters"]) != len(rib_parameters) or
+                len(glider.cells) != len(ballooning_factors)):
+            return self.get_glider_3d(glider, num=num, num_profile=num_profile)
+
+        new_state = self._get_build_state(rib_parameters, ballooning_factors, num_profile)
+        profiles_changed = new_state["profiles"] != state["profiles"]
+        elements_changed = new_state["elements"] != state["elements"]
+
+        ribs = glider.ribs
+        offset = 1 if self.shape.has_center_cell else 0
+        rib_material = self.elements.get("rib_material", None)
+
+        updated_ribs = []
+        # ribs with a changed geometry (-> attachment points)
+        changed_ribs = []
+        for rib_no, (parameters, parameters_old) in enumerate(zip(rib_parameters, state["rib_parameters"])):
+            geometry_changed = not _is_close(parameters, parameters_old)
+            if not geometry_changed and not profiles_changed and not elements_changed:
+                continue
+
+            rib = ribs[rib_no + offset]
+            startpoint, chord, arcang, aoa, zrot, glide, profile_factor = parameters
+
+            if profiles_changed or not _is_close(profile_factor, parameters_old[-1]):
+                rib.profile_2d = self._get_rib_profile(rib_no, profile_factor, profile_x_values)
+                if rib is ribs[-1]:
+                    glider.close_rib()
+                geometry_changed = True
+
+            rib.pos = np.array(startpoint)
+            rib.chord = chord
+            rib.arcang = arcang
+            rib.glide = glide
+            rib.zrot = zrot
+            rib.aoa_relative = aoa
+            rib.holes, rib.rigidfoils = self._get_rib_elements(rib_no)
+            rib.material_code = rib_material or ""
+
+            updated_ribs.append(rib)
+            if geometry_changed:
+                changed_ribs.append(rib)
+
+        if self.shape.has_center_cell and any(rib is ribs[1] for rib in updated_ribs):
+            self._update_mirrored_rib(ribs[0], ribs[1])
+            if any(rib is ribs[1] for rib in changed_ribs):
+                changed_ribs.append(ribs[0])
+
+        changed_cells = []
+        balloonings_changed = new_state["balloonings"] != state["balloonings"]
+        for cell_no, cell in enumerate(glider.cells):
+            factor = ballooning_factors[cell_no]
+            if balloonings_changed or not _is_close(factor, state["ballooning_factors"][cell_no]):
+                cell.ballooning = self.merge_ballooning(factor)
+                changed_cells.append(cell)
+
+        if elements_changed:
+            self._apply_elements(glider)
+
+        if new_state["lineset"] != state["lineset"]:
+            self._apply_lineset(glider)
+            # return_lineset sorts the 2d lineset
+            new_state["lineset"] = self._get_lineset_state()
+        elif changed_ribs or changed_cells:
+            self._update_lineset(glider, changed_ribs, changed_cells)
+
+        glider.parametric_build = new_state
+
         return glider
 
     def apply_ballooning(self, glider3d):
@@ -470,7 +705,11 @@ class ParametricGlider(object):
         def rescale(curve):
             span_orig = curve.controlpoints[-1][0]
             factor = span/span_orig
-            curve._data[:, 0] *= factor
+            # an assignment invalidates the cached values of the curve
+            if abs(factor - 1) > 1e-12:
+                controlpoints = np.array(curve.controlpoints)
+                controlpoints[:, 0] *= factor
+                curve.controlpoints = controlpoints
 
         rescale(self.ballooning_merge_curve)
         rescale(self.profile_merge_curve)
@@ -3,6 +3,7 @@ import math
 import numpy as np
 
 from openglider.glider.shape import Shape
+from openglider.utils.cache import cached_property
 from openglider.vector import Interpolation, PolyLine2D
 from openglider.utils.table import Table
 
@@ -68,16 +69,24 @@ class ParametricShape(object):
         back_scale = span / self.back_curve.controlpoints[-1][0]
         self.back_curve.scale(back_scale, 1)
 
-    @property
-    def rib_dist_interpolation(self):
+    @cached_property('rib_distribution', 'cell_num', 'num_distribution_interpolation')
+    def _rib_distribution(self):
         """
-        Interpolate Cell-distribution
+        [[x, relative position], ...] of the ribs (half glider)
         """
         data = self.rib_distribution.get_sequence(self.num_distribution_interpolation)
-        interpolation = Interpolation([[p[1], p[0]] for p in data])
+        interpolation = Interpolation(data[:, ::-1])
         start = self.has_center_cell / self.cell_num
         num = self.cell_num // 2 + 1
-        return [[interpolation(i), i] for i in np.linspace(start, 1, num)]
+        positions = np.linspace(start, 1, num)
+        return np.array([interpolation(positions), positions]).T
+
+    @property
+    def rib_dist_interpolation(self):
+        """
+        Interpolate Cell-distribution
+        """
+        return self._rib_distribution.tolist()
 
     @property
     def fast_interpolation(self):
@@ -99,7 +108,7 @@ class ParametricShape(object):
 
     @property
     def rib_x_values(self):
-        return [p[0] for p in self.rib_dist_interpolation]
+        return self._rib_distribution[:, 0].tolist()
 
     @property
     def cell_x_values(self):
@@ -113,17 +122,27 @@ class ParametricShape(object):
 
         return cells
 
-    def get_half_shape(self):
+    @cached_property('front_curve', 'back_curve', 'num_shape_interpolation',
+                     'rib_distribution', 'cell_num', 'num_distribution_interpolation')
+    def _half_shape(self):
         """
-        Return shape of the glider:
-        [ribs, front, back]
+        front and back points of the ribs (half glider)
         """
         num = self.num_shape_interpolation
         front_int = self.front_curve.interpolation(num=num)
         back_int = self.back_curve.interpolation(num=num)
-        dist = self.rib_x_values
-        front = [[x, front_int(x)] for x in dist]
-        back = [[x, back_int(x)] for x in dist]
+        dist = self._rib_distribution[:, 0]
+        front = np.array([dist, front_int(dist)]).T
+        back = np.array([dist, back_int(dist)]).T
+
+        return front, back
+
+    def get_half_shape(self):
+        """
+        Return shape of the glider:
+        [ribs, front, back]
+        """
+        front, back = self._half_shape
 
         return Shape(PolyLine2D(front), PolyLine2D(back))
 
@@ -0,0 +1,377 @@
+"""
+Design-space sweeps: evaluate many variants of a ParametricGlider.
+
+Every variant is a dict of parameters that is applied (in order) to a copy of the base glider,
+then the 3d glider is built and the metrics are evaluated:
+
+    variants = grid(area=[20, 22, 24], aspect_ratio=[5, 5.5, 6])
+    sweep = Sweep(glider_2d, metrics=["area", "aspect_ratio", "line_length"])
+
+    for row in sweep.run(variants, processes=0, path="sweep.csv"):
+        print(row)
+
+Parameters are looked up in the registered setters (see @parameter) or set as (dotted) attributes
+of the parametric glider ("speed", "shape.cell_num"). Metrics are registered with @metric.
+
+Rows are yielded as they complete. With a path every row is appended to a csv file right away
+(columns: index, parameter.<name>..., metric.<name>..., error),
+running the same sweep again skips the variants that are already in the file (resume),
+an incomplete last row (interrupted run) is discarded.
+With processes the pickled sweep is sent with every variant and unpickled once per worker,
+setters and metrics need to be module-level functions then.
+"""
+import concurrent.futures
+import csv
+import hashlib
+import io
+import itertools
+import logging
+import os
+import pickle
+import random
+
+from openglider.utils.table import Table
+
+logger = logging.getLogger(__name__)
+
+# name -> function(glider_2d, value)
+parameter_setters = {}
+# name -> function(glider_3d)
+metric_functions = {}
+
+
+def parameter(name):
+    def register(function):
+        parameter_setters[name] = function
+        return function
+    return register
+
+
+def metric(name):
+    def register(function):
+        metric_functions[name] = function
+        return function
+    return register
+
+
+@parameter("area")
+def set_area(glider_2d, area):
+    glider_2d.set_area(area)
+
+
+@parameter("aspect_ratio")
+def set_aspect_ratio(glider_2d, aspect_ratio):
+    """Change the aspect ratio, the area remains"""
+    glider_2d.set_aspect_ratio(aspect_ratio)
+
+
+@parameter("span")
+def set_span(glider_2d, span):
+    """Proportional scaling (the aspect ratio remains)"""
+    factor = span / glider_2d.shape.span
+    glider_2d.set_area(glider_2d.shape.area * factor**2)
+
+
+@parameter("cell_num")
+def set_cell_num(glider_2d, cell_num):
+    glider_2d.shape.cell_num = int(cell_num)
+
+
+@parameter("arc_factor")
+def set_arc_factor(glider_2d, factor):
+    """Scale the height of the arc, the arc length remains"""
+    arc = glider_2d.arc
+    arc.curve.controlpoints = [p * [1, factor] for p in arc.curve.controlpoints]
+    arc.rescale(glider_2d.shape.rib_x_values)
+
+
+@parameter("aoa_offset")
+def set_aoa_offset(glider_2d, offset):
+    """Add an offset (radians) to the angle of attack of all ribs"""
+    glider_2d.aoa.controlpoints = [p + [0, offset] for p in glider_2d.aoa.controlpoints]
+
+
+@metric("area")
+def get_area(glider):
+    return float(glider.area)
+
+
+@metric("projected_area")
+def get_projected_area(glider):
+    return float(glider.projected_area)
+
+
+@metric("aspect_ratio")
+def get_aspect_ratio(glider):
+    return float(glider.aspect_ratio)
+
+
+@metric("span")
+def get_span(glider):
+    return float(glider.span)
+
+
+@metric("line_length")
+def get_line_length(glider):
+    return float(glider.lineset.total_length)
+
+
+@metric("line_drag")
+def get_line_drag(glider):
+    return float(glider.lineset.get_drag()[1])
+
+
+@metric("floor_strength")
+def get_floor_strength(glider):
+    """Strength of the weakest line floor"""
+    return float(min(glider.lineset.get_floor_strength()))
+
+
+def grid(**values):
+    """
+    All combinations of the given values: grid(area=[20, 22], cell_num=[40, 50]) -> 4 variants
+    """
+    names = list(values)
+    for combination in itertools.product(*values.values()):
+        yield dict(zip(names, combination))
+
+
+def random_samples(num, seed=None, **ranges):
+    """
+    Uniformly distributed samples: random_samples(100, area=(20, 24), aspect_ratio=(5, 6))
+    """
+    generator = random.Random(seed)
+    for _ in range(num):
+        yield {name: generator.uniform(low, high) for name, (low, high) in ranges.items()}
+
+
+# unpickled sweep of the worker process: (key, sweep)
+_worker_sweep = (None, None)
+
+
+def _evaluate_variant(key, data, index, parameters):
+    global _worker_sweep
+    if _worker_sweep[0] != key:
+        _worker_sweep = (key, pickle.loads(data))
+    return _worker_sweep[1].evaluate_row(index, parameters)
+
+
+def _get_complete_size(path):
+    """
+    Size of the csv file without an incomplete last row (interrupted while writing)
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as infile:
+        return infile.read().rfind(b"\n") + 1
+
+
+class Sweep(object):
+    def __init__(self, glider_2d, metrics=None, setters=None):
+        """
+        :param glider_2d: base ParametricGlider (not modified)
+        :param metrics: names of the metrics (default: all registered)
+        :param setters: additional parameter setters {name: function(glider_2d, value)}
+        """
+        self.glider_2d = glider_2d
+        self.metrics = list(metrics or metric_functions)
+        self.setters = dict(setters or {})
+
+        for name in self.metrics:
+            if name not in metric_functions:
+                raise ValueError("Unknown metric: {}".format(name))
+
+    def get_setter(self, name):
+        if name in self.setters:
+            return self.setters[name]
+        if name in parameter_setters:
+            return parameter_setters[name]
+
+        def set_attribute(glider_2d, value):
+            obj = glider_2d
+            path = name.split(".")
+            for attribute in path[:-1]:
+                obj = getattr(obj, attribute)
+            setattr(obj, path[-1], value)
+
+        return set_attribute
+
+    def get_variant(self, parameters):
+        """
+        Copy of the base glider with the parameters applied
+        """
+        glider_2d = self.glider_2d.copy()
+        for name, value in parameters.items():
+            self.get_setter(name)(glider_2d, value)
+
+        return glider_2d
+
+    def evaluate(self, parameters):
+        """
+        :return: {metric: value}
+        """
+        glider = self.get_variant(parameters).get_glider_3d()
+        return {name: metric_functions[name](glider) for name in self.metrics}
+
+    def evaluate_row(self, index, parameters):
+        """
+        Evaluate a variant, errors (of the variant or single metrics) are returned in the row instead of being raised
+
+        :return: {"index": index, "parameters": parameters, "metrics": {name: value}, "error": ""}
+        """
+        row = {"index": index, "parameters": parameters, "error": ""}
+        row["metrics"] = {name: None for name in self.metrics}
+        try:
+            glider = self.get_variant(parameters).get_glider_3d()
+        except Exception as e:
+            logger.warning("variant {} ({}) failed: {!r}".format(index, parameters, e))
+            row["error"] = repr(e)
+            return row
+
+        errors = []
+        for name in self.metrics:
+            try:
+                row["metrics"][name] = metric_functions[name](glider)
+            except Exception as e:
+                errors.append("{}: {!r}".format(name, e))
+        row["error"] = "; ".join(errors)
+
+        return row
+
+    def get_columns(self, variants):
+        parameter_names = []
+        for parameters in variants:
+            for name in parameters:
+                if name not in parameter_names:
+                    parameter_names.append(name)
+
+        return (["index"] +
+                ["parameter." + name for name in parameter_names] +
+                ["metric." + name for name in self.metrics] +
+                ["error"])
+
+    @staticmethod
+    def flatten_row(row):
+        """
+        {index, parameter.name..., metric.name..., error} as used for the csv/Table columns
+        """
+        flat = {"index": row["index"], "error": row["error"]}
+        flat.update({"parameter." + name: value for name, value in row["parameters"].items()})
+        flat.update({"metric." + name: value for name, value in row["metrics"].items()})
+        return flat
+
+    def read_checkpoint(self, path, variants):
+        """
+        Rows of the variants that are already in the csv file: {index: row}
+        """
+        size = _get_complete_size(path)
+        if size == 0:
+            return {}
+
+        columns = self.get_columns(variants)
+        with open(path, "rb") as infile:
+            data = infile.read(size).decode()
+        with io.StringIO(data, newline="") as infile:
+            reader = csv.DictReader(infile)
+            if reader.fieldnames != columns:
+                raise ValueError("Checkpoint {} has different columns: {}".format(path, reader.fieldnames))
+
+            rows = {}
+            for line in reader:
+                index = int(line["index"])
+                parameters = variants[index] if index < len(variants) else None
+                if parameters is None or any(line["parameter." + name] != str(value)
+                                             for name, value in parameters.items()):
+                    raise ValueError("Checkpoint {} belongs to a different sweep (index {})".format(path, index))
+
+                rows[index] = {
+                    "index": index,
+                    "parameters": parameters,
+                    "metrics": {name: float(line["metric." + name]) if line["metric." + name] else None
+                                for name in self.metrics},
+                    "error": line["error"]
+                }
+
+        return rows
+
+    def run(self, variants, processes=None, path=None):
+        """
+        Evaluate the variants, the rows (see evaluate_row) are yielded as they complete.
+
+        :param variants: iterable of parameter dicts (see grid/random_samples)
+        :param processes: number of worker processes (None/1 -> sequential, 0 -> one per cpu)
+        :param path: csv file to append the rows to; variants that are already in it are skipped
+        """
+        variants = [dict(parameters) for parameters in variants]
+
+        done = {}
+        outfile = writer = None
+        if path is not None:
+            done = self.read_checkpoint(path, variants)
+            if done:
+                logger.info("resuming sweep: {} of {} variants done".format(len(done), len(variants)))
+            size = _get_complete_size(path)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                logger.warning("removing the incomplete last row of {}".format(path))
+                with open(path, "r+b") as outfile:
+                    outfile.truncate(size)
+            write_header = size == 0
+            outfile = open(path, "a", newline="")
+            writer = csv.DictWriter(outfile, self.get_columns(variants))
+            if write_header:
+                writer.writeheader()
+                outfile.flush()
+
+        todo = [(index, parameters) for index, parameters in enumerate(variants) if index not in done]
+
+        try:
+            for row in self._evaluate_all(todo, processes):
+                if writer is not None:
+                    writer.writerow(self.flatten_row(row))
+                    outfile.flush()
+                yield row
+        finally:
+            if outfile is not None:
+                outfile.close()
+
+    def _evaluate_all(self, todo, processes):
+        if processes is None or processes == 1:
+            for index, parameters in todo:
+                yield self.evaluate_row(index, parameters)
+            return
+
+        # the sweep is pickled once, every worker unpickles it only once
+        # (ProcessPoolExecutor has no initializer before python 3.7)
+        data = pickle.dumps(self)
+        key = hashlib.sha1(data).hexdigest()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes or None) as executor:
+            futures = [executor.submit(_evaluate_variant, key, data, index, parameters)
+                       for index, parameters in todo]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def get_table(self, variants, processes=None, path=None):
+        """
+        Run the sweep and return all rows (sorted by index) as a Table,
+        including the rows of a resumed checkpoint
+        """
+        variants = [dict(parameters) for parameters in variants]
+
+        rows = {}
+        if path is not None:
+            rows.update(self.read_checkpoint(path, variants))
+        for row in self.run(variants, processes, path):
+            rows[row["index"]] = row
+
+        columns = self.get_columns(variants)
+        table = Table()
+        table.insert_row(columns)
+        for index in sorted(rows):
+            flat = self.flatten_row(rows[index])
+            table.insert_row([flat.get(column) for column in columns])
+
+        return table
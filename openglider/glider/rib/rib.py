@@ -78,8 +78,13 @@ class Rib(CachedObject):
         raise ValueError("Can only Align one single 2D or 3D-Point")
 
     def align_x(self, x_value):
-        ik = self.profile_2d(x_value)
-        return self.profile_3d[ik]
+        """
+        Get the 3d-point(s) for one or an array of x-values (negative: upper side)
+        """
+        if np.ndim(x_value) > 0:
+            return self.profile_3d.get_points(self.profile_2d.get_ik_values(x_value))
+
+        return self.profile_3d[self.profile_2d(x_value)]
 
     def rename_parts(self):
         for hole_no, hole in enumerate(self.holes):
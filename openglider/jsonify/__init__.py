@@ -1,12 +1,18 @@
+import base64
 import json
 import re
 import time
 import datetime
+import functools
+import zipfile
+
+import numpy as np
 
 import openglider.jsonify.migration
 from openglider.utils import recursive_getattr
+from openglider.utils.instrumentation import timed
 
-__ALL__ = ['dumps', 'dump', 'loads', 'load']
+__ALL__ = ['dumps', 'dump', 'loads', 'load', 'dump_container', 'load_container', 'LoadProfile']
 
 # Main json-export routine.
 # Maybe at some point it can become necessary to de-reference classes with _module also,
@@ -15,9 +21,52 @@ __ALL__ = ['dumps', 'dump', 'loads', 'load']
 datetime_format = "%d.%m.%Y %H:%M"
 datetime_format_regex = re.compile(r'^\d{2}\.\d{2}\.\d{4} \d{2}:\d{2}$')
 
+# array_format:
+#   "list": nested lists (default, readable)
+#   "base64": {"_type": "ndarray", "_module": "numpy", "data": {"dtype", "shape", "base64"}}
+#   "npz": {"_type": "ndarray", "_module": "numpy", "data": {"npz": key}} + side-array in the container
+# arrays smaller than array_min_size are always stored as lists
+array_formats = ("list", "base64", "npz")
+array_min_size = 16
+
+
 class Encoder(json.JSONEncoder):
+    def __init__(self, *args, array_format="list", arrays=None, **kwargs):
+        """
+        :param array_format: "list", "base64" or "npz"
+        :param arrays: dict to collect the side-arrays for array_format="npz"
+        """
+        if array_format not in array_formats:
+            raise ValueError("invalid array_format: {}".format(array_format))
+        if array_format == "npz" and arrays is None:
+            raise ValueError("array_format 'npz' needs a dict to store the arrays")
+
+        super(Encoder, self).__init__(*args, **kwargs)
+        self.array_format = array_format
+        self.arrays = arrays
+
+    def encode_array(self, array):
+        if self.array_format == "list" or array.size < array_min_size or array.dtype.kind not in "biuf":
+            return array.tolist()
+
+        if self.array_format == "base64":
+            array = np.ascontiguousarray(array)
+            data = {"dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                    "base64": base64.b64encode(array.tobytes()).decode("ascii")}
+        else:
+            key = "arr_{}".format(len(self.arrays))
+            self.arrays[key] = array
+            data = {"npz": key}
+
+        return {"_type": "ndarray",
+                "_module": "numpy",
+                "data": data}
+
     def default(self, obj):
-        if obj.__class__.__module__ == 'numpy':
+        if isinstance(obj, np.ndarray):
+            return self.encode_array(obj)
+        elif obj.__class__.__module__ == 'numpy':
             return obj.tolist()
         elif isinstance(obj, datetime.datetime):
             return obj.strftime(datetime_format)
@@ -34,41 +83,152 @@ class Encoder(json.JSONEncoder):
             return super(Encoder, self).default(obj)
 
 
-def get_element(_module, _name):
-    for rex in openglider.config["json_forbidden_modules"]:
-        if re.match(rex, _module):
-            raise Exception
-        elif re.match(rex, _name):
-            raise Exception
-    for rex in openglider.config["json_allowed_modules"]:
-        match = re.match(rex, _module)
-        if match:
-            fromlist = [str(w) for w in _module.split(".")]
-            module = __import__(_module, fromlist=fromlist)
-            obj = recursive_getattr(module, _name)
+class _ElementResolver(object):
+    """
+    Resolve (module, name) -> class/function.
+
+    The allow/deny-patterns are compiled once (and again whenever the config lists change),
+    resolved elements are memoized per (module, name).
+    """
+    def __init__(self):
+        self._config = None
+        self._forbidden = []
+        self._allowed = []
+        self._elements = {}
+
+    def _update_patterns(self):
+        config = (tuple(openglider.config["json_forbidden_modules"]),
+                  tuple(openglider.config["json_allowed_modules"]))
+
+        if config != self._config:
+            self._forbidden = [re.compile(rex) for rex in config[0]]
+            self._allowed = [re.compile(rex) for rex in config[1]]
+            self._elements.clear()
+            self._config = config
+
+    def resolve(self, _module, _name):
+        for rex in self._forbidden:
+            if rex.match(_module) or rex.match(_name):
+                raise Exception("forbidden element: {} ({})".format(_name, _module))
+
+        for rex in self._allowed:
+            if rex.match(_module):
+                fromlist = [str(w) for w in _module.split(".")]
+                module = __import__(_module, fromlist=fromlist)
+                return recursive_getattr(module, _name)
+
+    def __call__(self, _module, _name):
+        self._update_patterns()
+        key = (_module, _name)
+        try:
+            return self._elements[key]
+        except KeyError:
+            obj = self.resolve(_module, _name)
+            if obj is not None:
+                self._elements[key] = obj
             return obj
 
 
-def object_hook(dct):
+get_element = _ElementResolver()
+
+
+class LoadProfile(object):
+    """
+    Collect the time spent per deserialized type.
+    Children are created before their parents, so the times are exclusive.
+
+    profile = LoadProfile()
+    openglider.load(path, profile=profile)
+    print(profile)
+    """
+    def __init__(self):
+        self.elements = {}  # (module, name) -> [count, seconds]
+        self.total = 0.
+
+    def add(self, _module, _name, duration):
+        entry = self.elements.setdefault((_module, _name), [0, 0.])
+        entry[0] += 1
+        entry[1] += duration
+
+    def get_table(self):
+        """
+        :return: [(module, name, count, seconds)] sorted by time
+        """
+        rows = [(key[0], key[1], count, duration) for key, (count, duration) in self.elements.items()]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def __str__(self):
+        lines = ["total: {:.3f}s".format(self.total)]
+        for _module, _name, count, duration in self.get_table():
+            share = duration / self.total * 100 if self.total else 0
+            lines.append("{:>8.3f}s {:>5.1f}% {:>7} {}.{}".format(duration, share, count, _module, _name))
+        return "\n".join(lines)
+
+
+def decode_array(data, arrays=None):
+    if "npz" in data:
+        if arrays is None:
+            raise ValueError("array {} is stored in a container, use openglider.load".format(data["npz"]))
+        return arrays[data["npz"]]
+
+    array = np.frombuffer(base64.b64decode(data["base64"]), dtype=data["dtype"])
+    return array.reshape(data["shape"]).copy()
+
+
+def _is_datetime(value):
+    # cheap pre-check before the regex: "dd.mm.yyyy HH:MM"
+    return len(value) == 16 and value[2] == "." and value[13] == ":" and datetime_format_regex.match(value)
+
+
+def object_hook(dct, arrays=None, profile=None):
     """
     Return the de-serialized object
+    :param arrays: side-arrays of a container (array_format="npz")
+    :param profile: LoadProfile to record the time per type
     """
     for key, value in dct.items():
-        if isinstance(value, str) and datetime_format_regex.match(value):
+        if value.__class__ is str and _is_datetime(value):
             dct[key] = datetime.datetime.strptime(value, datetime_format)
-            
-    if '_type' in dct and '_module' in dct:
-        obj = get_element(dct["_module"], dct["_type"])
+
+    if '_type' not in dct or '_module' not in dct:
+        return dct
+
+    _module, _name = dct["_module"], dct["_type"]
+    if profile is not None:
+        start = time.perf_counter()
+
+    if _name == "ndarray" and _module == "numpy":
+        result = decode_array(dct["data"], arrays)
+    else:
+        obj = get_element(_module, _name)
 
         try:
             # use the __from_json__ function if present. __init__ otherwise
             deserializer = getattr(obj, '__from_json__', obj)
-            return deserializer(**dct['data'])
+            result = deserializer(**dct['data'])
         except TypeError as e:
-            raise TypeError("{} in element: {} ({})".format(e, dct["_type"], dct["_module"]))
+            raise TypeError("{} in element: {} ({})".format(e, _name, _module))
 
-    else:
-        return dct
+    if profile is not None:
+        profile.add(_module, _name, time.perf_counter() - start)
+
+    return result
+
+
+def _get_object_hook(arrays=None, profile=None):
+    if arrays is None and profile is None:
+        return object_hook
+    return functools.partial(object_hook, arrays=arrays, profile=profile)
+
+
+def _profiled(profile, function, *args, **kwargs):
+    if profile is None:
+        return function(*args, **kwargs)
+
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    profile.total += time.perf_counter() - start
+    return result
 
 
 def add_metadata(data):
@@ -84,25 +244,73 @@ def add_metadata(data):
                 'data': data}
 
 
-def dumps(obj, add_meta=True):
+@timed()
+def dumps(obj, add_meta=True, array_format="list"):
+    """
+    :param array_format: "list" or "base64" (compact, binary arrays)
+    """
     if add_meta:
         obj = add_metadata(obj)
-    return json.dumps(obj, cls=Encoder)
+    return json.dumps(obj, cls=Encoder, array_format=array_format)
 
 
-def dump(obj, fp, add_meta=True):
+@timed()
+def dump(obj, fp, add_meta=True, array_format="list"):
     if add_meta:
         obj = add_metadata(obj)
-    return json.dump(obj, fp, cls=Encoder, indent=4)
+    return json.dump(obj, fp, cls=Encoder, indent=4, array_format=array_format)
 
 
-def loads(obj):
+@timed()
+def loads(obj, profile=None):
+    """
+    :param profile: LoadProfile to record the deserialization time per type
+    """
     try:
-        return json.loads(obj, object_hook=object_hook)
-    except:
+        return _profiled(profile, json.loads, obj, object_hook=_get_object_hook(profile=profile))
+    except Exception:
         data = openglider.jsonify.migration.migrate(obj)
-        return loads(data)
+        return loads(data, profile=profile)
+
+
+@timed()
+def load(fp, profile=None):
+    return _profiled(profile, json.load, fp, object_hook=_get_object_hook(profile=profile))
+
+
+# Container: a zip-file with the json-data and the arrays as .npy files (readable by np.load)
+container_json = "data.json"
+
+
+@timed()
+def dump_container(obj, path, add_meta=True):
+    """
+    Write obj to a zip-container: json with references to the arrays, which are stored as npy-files
+    """
+    if add_meta:
+        obj = add_metadata(obj)
+
+    arrays = {}
+    data = json.dumps(obj, cls=Encoder, array_format="npz", arrays=arrays)
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as container:
+        container.writestr(container_json, data)
+        for key, array in arrays.items():
+            with container.open(key + ".npy", "w") as outfile:
+                np.lib.format.write_array(outfile, np.asanyarray(array), allow_pickle=False)
+
+    return path
+
+
+@timed()
+def load_container(path, profile=None):
+    with zipfile.ZipFile(path) as container:
+        arrays = {}
+        for name in container.namelist():
+            if name.endswith(".npy"):
+                with container.open(name) as infile:
+                    arrays[name[:-4]] = np.lib.format.read_array(infile, allow_pickle=False)
 
+        data = container.read(container_json).decode("utf-8")
 
-def load(fp):
-    return json.load(fp, object_hook=object_hook)
\ No newline at end of file
+    return _profiled(profile, json.loads, data, object_hook=_get_object_hook(arrays, profile))
\ No newline at end of file
@@ -22,7 +22,7 @@ from __future__ import division
 import numpy as np
 from numpy import dot
 
-from openglider.lines.elements import Line, Node, SagMatrix
+from openglider.lines.elements import Line, Node, SagMatrix, SagTree
 from openglider.lines.lineset import LineSet
 from openglider.vector.functions import norm, normalize
 from openglider.lines.functions import proj_force
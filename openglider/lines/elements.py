@@ -27,25 +27,53 @@ from openglider.utils.cache import cached_property, CachedObject
 from openglider.vector import PolyLine
 from openglider.vector.functions import norm, normalize
 from openglider.mesh import Mesh, Vertex, Polygon
+import scipy.sparse
+import scipy.sparse.linalg
 
 logging.getLogger(__file__)
 
 class SagMatrix():
-    def __init__(self, number_of_lines):
-        size = number_of_lines * 2
-        self.matrix = np.zeros([size, size])
-        self.rhs = np.zeros(size)
-        self.solution = np.zeros(size)
+    """
+    Linear system for the sag parameters of all lines (2 unknowns per line).
+    The entries are collected sparse, solve_system uses scipy.sparse if
+    requested and a dense solver otherwise.
+    """
+    def __init__(self, number_of_lines, sparse=False):
+        self.size = number_of_lines * 2
+        self.sparse = sparse
+        self.entries = {}
+        self.rhs = np.zeros(self.size)
+        self.solution = np.zeros(self.size)
 
     def __str__(self):
         return str(self.matrix) + "\n" + str(self.rhs)
 
+    def __setitem__(self, index, value):
+        self.entries[index] = value
+
+    def get_coo(self):
+        """
+        :return: rows, columns, values
+        """
+        if not self.entries:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+        indices = np.array(list(self.entries.keys()), dtype=int)
+        values = np.array(list(self.entries.values()), dtype=float)
+        return indices[:, 0], indices[:, 1], values
+
+    @property
+    def matrix(self):
+        matrix = np.zeros([self.size, self.size])
+        rows, columns, values = self.get_coo()
+        matrix[rows, columns] = values
+        return matrix
+
     def insert_type_0_lower(self, line):
         """
         fixed lower node
         """
         i = line.number
-        self.matrix[2 * i + 1, 2 * i + 1] = 1.
+        self[2 * i + 1, 2 * i + 1] = 1.
 
     def insert_type_1_lower(self, line, lower_line):
         """
@@ -53,9 +81,9 @@ class SagMatrix():
         """
         i = line.number
         j = lower_line.number
-        self.matrix[2 * i + 1, 2 * i + 1] = 1.
-        self.matrix[2 * i + 1, 2 * j + 1] = -1.
-        self.matrix[2 * i + 1, 2 * j] = -lower_line.length_projected
+        self[2 * i + 1, 2 * i + 1] = 1.
+        self[2 * i + 1, 2 * j + 1] = -1.
+        self[2 * i + 1, 2 * j] = -lower_line.length_projected
         self.rhs[2 * i + 1] = -lower_line.ortho_pressure * \
             lower_line.length_projected ** 2 / lower_line.force_projected / 2
 
@@ -64,7 +92,7 @@ class SagMatrix():
         free upper node
         """
         i = line.number
-        self.matrix[2 * i, 2 * i] = 1
+        self[2 * i, 2 * i] = 1
         infl_list = []
         vec = line.diff_vector_projected
         for u in upper_lines:
@@ -73,7 +101,7 @@ class SagMatrix():
         sum_infl = sum(infl_list)
         for k in range(len(upper_lines)):
             j = upper_lines[k].number
-            self.matrix[2 * i, 2 * j] = -(infl_list[k] / sum_infl)
+            self[2 * i, 2 * j] = -(infl_list[k] / sum_infl)
         self.rhs[2 * i] = line.ortho_pressure * \
             line.length_projected / line.force_projected
 
@@ -82,13 +110,94 @@ class SagMatrix():
         Fixed upper node
         """
         i = line.number
-        self.matrix[2 * line.number, 2 * line.number] = line.length_projected
-        self.matrix[2 * line.number, 2 * line.number + 1] = 1.
+        self[2 * line.number, 2 * line.number] = line.length_projected
+        self[2 * line.number, 2 * line.number + 1] = 1.
         self.rhs[2 * i] = line.ortho_pressure * \
             line.length_projected ** 2 / line.force_projected / 2
 
     def solve_system(self):
-        self.solution = np.linalg.solve(self.matrix, self.rhs)
+        if self.sparse:
+            rows, columns, values = self.get_coo()
+            matrix = scipy.sparse.coo_matrix((values, (rows, columns)), shape=(self.size, self.size))
+            self.solution = scipy.sparse.linalg.spsolve(matrix.tocsr(), self.rhs)
+        else:
+            self.solution = np.linalg.solve(self.matrix, self.rhs)
+
+    def get_sag_parameters(self, line_nr):
+        return [
+            self.solution[line_nr * 2],
+            self.solution[line_nr * 2 + 1]]
+
+
+class SagTree():
+    """
+    Direct solver for the sag-system, walking along the line hierarchy:
+    the sag parameters of a line only depend on its lower line and its upper lines.
+
+    Every line gets an affine relation sag_par_1 = alpha + beta * sag_par_2 (top-down),
+    then sag_par_2 is set from the lowest lines upwards.
+    """
+    def __init__(self, number_of_lines):
+        self.solution = np.zeros(number_of_lines * 2)
+        self.lower = [None] * number_of_lines  # (lower line no, length_projected, rhs) or None
+        self.upper = [None] * number_of_lines  # ([(upper line no, weight)] or None, length_projected, rhs)
+
+    def insert_type_0_lower(self, line):
+        self.lower[line.number] = None
+
+    def insert_type_1_lower(self, line, lower_line):
+        rhs = -lower_line.ortho_pressure * lower_line.length_projected ** 2 / lower_line.force_projected / 2
+        self.lower[line.number] = (lower_line.number, lower_line.length_projected, rhs)
+
+    def insert_type_1_upper(self, line, upper_lines):
+        vec = line.diff_vector_projected
+        infl_list = [u.force_projected * np.dot(vec, u.diff_vector_projected) for u in upper_lines]
+        sum_infl = sum(infl_list)
+        weights = [(u.number, infl / sum_infl) for u, infl in zip(upper_lines, infl_list)]
+        rhs = line.ortho_pressure * line.length_projected / line.force_projected
+        self.upper[line.number] = (weights, line.length_projected, rhs)
+
+    def insert_type_2_upper(self, line):
+        rhs = line.ortho_pressure * line.length_projected ** 2 / line.force_projected / 2
+        self.upper[line.number] = (None, line.length_projected, rhs)
+
+    def solve_system(self):
+        num_lines = len(self.lower)
+        alpha = np.zeros(num_lines)
+        beta = np.zeros(num_lines)
+
+        def get_affine(i):
+            weights, length, rhs = self.upper[i]
+            if weights is None:
+                # length * a + b = rhs
+                alpha[i] = rhs / length
+                beta[i] = -1. / length
+            else:
+                # a - sum(w_k * a_k) = rhs with b_k = b + length * a + rhs_k
+                alpha_sum = rhs
+                beta_sum = 0.
+                for k, weight in weights:
+                    get_affine(k)
+                    rhs_k = self.lower[k][2]
+                    alpha_sum += weight * (alpha[k] + beta[k] * rhs_k)
+                    beta_sum += weight * beta[k]
+                denominator = 1 - beta_sum * length
+                alpha[i] = alpha_sum / denominator
+                beta[i] = beta_sum / denominator
+
+        def set_solution(i, b):
+            a = alpha[i] + beta[i] * b
+            self.solution[2 * i] = a
+            self.solution[2 * i + 1] = b
+
+            weights, length, _ = self.upper[i]
+            for k, _ in weights or []:
+                set_solution(k, b + length * a + self.lower[k][2])
+
+        for i in range(num_lines):
+            if self.lower[i] is None and self.upper[i] is not None:
+                get_affine(i)
+                set_solution(i, 0.)
 
     def get_sag_parameters(self, line_nr):
         return [
@@ -126,6 +235,29 @@ class Line(CachedObject):
 
         self.lineset = None      # the parent have to be set after initialization
 
+    @property
+    def lower_node(self):
+        return self._lower_node
+
+    @lower_node.setter
+    def lower_node(self, node):
+        self._lower_node = node
+        self._invalidate_lineset()
+
+    @property
+    def upper_node(self):
+        return self._upper_node
+
+    @upper_node.setter
+    def upper_node(self, node):
+        self._upper_node = node
+        self._invalidate_lineset()
+
+    def _invalidate_lineset(self):
+        lineset = getattr(self, "lineset", None)
+        if lineset is not None:
+            lineset.invalidate_index()
+
     @property
     def color(self):
         return self._color or "default"
@@ -1,22 +1,56 @@
+import functools
 import re
 import numpy as np
 import copy
 import logging
-from openglider.lines import SagMatrix
+from openglider.lines import SagMatrix, SagTree
 
 from openglider.lines.functions import proj_force
 from openglider.lines.elements import Node
 from openglider.mesh import Mesh
 from openglider.vector.functions import norm, normalize
 from openglider.utils.table import Table
+from openglider.utils.instrumentation import timed
 
 logging.getLogger(__file__)
 
+def _changes_list(method):
+    @functools.wraps(method)
+    def change(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+    return change
+
+
+class LineList(list):
+    """
+    List of lines with a version number that is bumped on every change
+    (including lines replaced in place), used to track the node index
+    """
+    version = 0
+
+    __setitem__ = _changes_list(list.__setitem__)
+    __delitem__ = _changes_list(list.__delitem__)
+    __iadd__ = _changes_list(list.__iadd__)
+    __imul__ = _changes_list(list.__imul__)
+    append = _changes_list(list.append)
+    extend = _changes_list(list.extend)
+    insert = _changes_list(list.insert)
+    pop = _changes_list(list.pop)
+    remove = _changes_list(list.remove)
+    clear = _changes_list(list.clear)
+    sort = _changes_list(list.sort)
+    reverse = _changes_list(list.reverse)
+
+
 class LineSet(object):
     """
     Set of different lines
     """
     calculate_sag = True
+    # "dense", "sparse" or "tree" (direct solver for tree-shaped linesets: faster, same results
+    # as the dense solver up to floating point precision)
+    sag_solver = "dense"
     knots_table = [
         # lower_line_type, upper_line_type, upper_line_count, first_line_correction, last_line_correction
         ["liros.ltc65", "liros.ltc65", 2, 2.0, 2.0]
@@ -27,11 +61,50 @@ class LineSet(object):
             v_inf = np.array(v_inf)
         self.v_inf = v_inf
         self.lines = lines or []
-        for line in lines:
+        for line in self.lines:
             line.lineset = self
         self.mat = None
         self.glider = None
 
+    @property
+    def lines(self):
+        return self._lines
+
+    @lines.setter
+    def lines(self, lines):
+        if not isinstance(lines, LineList):
+            lines = LineList(lines)
+        self._lines = lines
+        self.invalidate_index()
+
+    def invalidate_index(self):
+        """
+        Drop the node -> line index and the memoized influence nodes,
+        they are rebuilt on the next lookup.
+        """
+        self._node_index = None
+        self._node_index_state = None
+        self._influence_nodes = {}
+
+    def _get_node_index(self):
+        """
+        node -> connected lines lookup: ({id(node): upper lines}, {id(node): lower lines})
+        rebuilt when the lines-list is replaced or changed
+        """
+        state = (id(self._lines), self._lines.version)
+        if self._node_index is None or self._node_index_state != state:
+            upper_lines = {}
+            lower_lines = {}
+            for line in self._lines:
+                upper_lines.setdefault(id(line.lower_node), []).append(line)
+                lower_lines.setdefault(id(line.upper_node), []).append(line)
+
+            self._node_index = (upper_lines, lower_lines)
+            self._node_index_state = state
+            self._influence_nodes = {}
+
+        return self._node_index
+
     def __repr__(self):
         return """
         {}
@@ -148,7 +221,10 @@ class LineSet(object):
         return strength_list
 
     def get_mesh(self, numpoints=10):
-        return sum([line.get_mesh(numpoints) for line in self.lines], Mesh())
+        mesh = Mesh()
+        for line in self.lines:
+            mesh += line.get_mesh(numpoints)
+        return mesh
 
     def get_upper_line_mesh(self, numpoints=1, breaks=False):
         mesh = Mesh()
@@ -160,6 +236,7 @@ class LineSet(object):
             mesh += line.get_mesh(numpoints)
         return mesh
 
+    @timed()
     def recalc(self, calculate_sag=True, iterations=1):
         """
         Recalculate Lineset Geometry.
@@ -202,11 +279,20 @@ class LineSet(object):
 
                 self._calc_geo(self.get_upper_connected_lines(line.upper_node))
 
-    def _calc_sag(self, start=None):
+    @timed()
+    def _calc_sag(self, start=None, solver=None):
         if start is None:
             start = self.lowest_lines
+        solver = solver or self.sag_solver
         # 0 every line calculates its parameters
-        self.mat = SagMatrix(len(self.lines))
+        if solver == "tree":
+            self.mat = SagTree(len(self.lines))
+        elif solver == "sparse":
+            self.mat = SagMatrix(len(self.lines), sparse=True)
+        elif solver == "dense":
+            self.mat = SagMatrix(len(self.lines))
+        else:
+            raise ValueError("unknown sag solver: {}".format(solver))
 
         # calculate projections
         for n in self.nodes:
@@ -264,7 +350,7 @@ class LineSet(object):
                     line_lower.force = norm(force_projected)
 
     def get_upper_connected_lines(self, node):
-        return [line for line in self.lines if line.lower_node is node]
+        return list(self._get_node_index()[0].get(id(node), []))
 
     def get_upper_lines(self, node):
         """
@@ -279,7 +365,7 @@ class LineSet(object):
         return lines
 
     def get_lower_connected_lines(self, node):
-        return [line for line in self.lines if line.upper_node is node]
+        return list(self._get_node_index()[1].get(id(node), []))
 
     def get_connected_lines(self, node):
         return self.get_upper_connected_lines(node) + self.get_lower_connected_lines(node)
@@ -360,12 +446,16 @@ class LineSet(object):
 
         if node.type == 2:
             return [node]
-        else:
+
+        self._get_node_index()  # drops the memoized nodes if the index is outdated
+        if id(node) not in self._influence_nodes:
             upper_lines = self.get_upper_connected_lines(node)
             result = []
             for upper_line in upper_lines:
                 result += self.get_upper_influence_nodes(line=upper_line)
-            return result
+            self._influence_nodes[id(node)] = result
+
+        return self._influence_nodes[id(node)][:]
 
     def iterate_target_length(self, steps=10, pre_load=50):
         """
@@ -615,14 +705,20 @@ class LineSet(object):
         return copy.deepcopy(self)
 
     def __json__(self):
-        new = self.copy()
-        nodes = list(new.nodes)
-        for line in new.lines:
-            line.upper_node = nodes.index(line.upper_node)
-            line.lower_node = nodes.index(line.lower_node)
+        nodes = list(self.nodes)
+        node_indices = {id(node): index for index, node in enumerate(nodes)}
+
+        # replace the nodes by their index (on shallow copies of the lines)
+        lines = []
+        for line in self.lines:
+            line = copy.copy(line)
+            line.lineset = None
+            line.upper_node = node_indices[id(line.upper_node)]
+            line.lower_node = node_indices[id(line.lower_node)]
+            lines.append(line)
 
         return {
-            'lines': new.lines,
+            'lines': lines,
             'nodes': nodes,
             'v_inf': self.v_inf.tolist()
         }
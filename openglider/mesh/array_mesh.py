@@ -0,0 +1,306 @@
+from __future__ import division
+
+import copy
+import io
+import logging
+
+import numpy as np
+
+from openglider.mesh.mesh import Mesh
+
+logger = logging.getLogger(__name__)
+
+
+def _format_rows(fmt, array):
+    """
+    Format every row of a 2d-array with fmt (one line per row)
+    """
+    if not len(array):
+        return ""
+    return ((fmt + "\n") * len(array)) % tuple(array.ravel().tolist())
+
+
+def _write_rows(outfile, fmt, array, chunksize=10000):
+    """
+    Write a 2d-array to a text file (one line per row), chunk by chunk
+    """
+    for start in range(0, len(array), chunksize):
+        outfile.write(_format_rows(fmt, array[start:start+chunksize]))
+
+
+def _write_binary(outfile, records, chunksize=100000):
+    """
+    Write a structured array to a binary file, chunk by chunk
+    """
+    for start in range(0, len(records), chunksize):
+        outfile.write(records[start:start+chunksize].tobytes())
+
+
+class ArrayMesh(object):
+    """
+    Mesh stored in numpy arrays instead of Vertex/Polygon objects.
+
+    vertices: float64 array (N, 3)
+    polygons: {group_name: {num_vertices: int32 array (M, num_vertices)}}
+        num_vertices 2 -> lines, 3 -> triangles, 4 -> quadrangles
+    boundaries: {boundary_name: int32 array of vertex indices}
+
+    Vertex- and polygon-attributes of a Mesh are not carried over.
+    """
+    def __init__(self, vertices=None, polygons=None, boundaries=None, name=None):
+        if vertices is None:
+            vertices = np.zeros((0, 3))
+        self.vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.polygons = {}
+        for group_name, faces in (polygons or {}).items():
+            self.add_polygons(group_name, faces)
+
+        self.boundaries = {name: np.asarray(indices, dtype=np.int32)
+                           for name, indices in (boundaries or {}).items()}
+        self.name = name or "unnamed"
+
+    def __repr__(self):
+        return "ArrayMesh {} ({} faces, {} vertices)".format(self.name,
+                                                           self.num_polygons,
+                                                           len(self.vertices))
+
+    def add_polygons(self, group_name, faces):
+        """
+        Add faces to a polygon group.
+        :param faces: int array (M, n), a list of index-lists (mixed lengths) or {n: array}
+        """
+        group = self.polygons.setdefault(group_name, {})
+
+        if isinstance(faces, dict):
+            faces_by_size = faces.items()
+        elif isinstance(faces, np.ndarray):
+            faces_by_size = [(faces.shape[1], faces)] if len(faces) else []
+        else:
+            faces_by_size = {}
+            for face in faces:
+                faces_by_size.setdefault(len(face), []).append(list(face))
+            faces_by_size = faces_by_size.items()
+
+        for num_vertices, group_faces in faces_by_size:
+            group_faces = np.asarray(group_faces, dtype=np.int32).reshape(-1, num_vertices)
+            if num_vertices in group:
+                group[num_vertices] = np.concatenate([group[num_vertices], group_faces])
+            else:
+                group[num_vertices] = group_faces
+
+    @property
+    def num_polygons(self):
+        return sum(len(faces) for group in self.polygons.values() for faces in group.values())
+
+    def get_faces(self, group_name=None, num_vertices=None):
+        """
+        Get all faces (of a group / with a certain number of vertices) in one list of arrays
+        """
+        groups = self.polygons.values() if group_name is None else [self.polygons[group_name]]
+        faces = []
+        for group in groups:
+            for size, group_faces in group.items():
+                if num_vertices is None or size == num_vertices:
+                    faces.append(group_faces)
+        return faces
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        vertices, polygons, boundaries = mesh.get_indexed()
+        vertices = np.array([list(vertex) for vertex in vertices], dtype=np.float64)
+        polygons = {name: [poly.nodes for poly in group] for name, group in polygons.items()}
+
+        return cls(vertices, polygons, boundaries, name=mesh.name)
+
+    def to_mesh(self):
+        polygons = {}
+        for group_name, group in self.polygons.items():
+            polygons[group_name] = [face for faces in group.values() for face in faces.tolist()]
+
+        boundaries = {name: indices.tolist() for name, indices in self.boundaries.items()}
+
+        return Mesh.from_indexed(self.vertices.tolist(), polygons, boundaries, name=self.name)
+
+    def get_indexed(self):
+        """
+        Get [vertices, polygons, boundaries] with references by index (like Mesh.get_indexed)
+        """
+        polygons = {name: [face for faces in group.values() for face in faces.tolist()]
+                    for name, group in self.polygons.items()}
+        boundaries = {name: indices.tolist() for name, indices in self.boundaries.items()}
+
+        return self.vertices, polygons, boundaries
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def __iadd__(self, other):
+        if isinstance(other, Mesh):
+            other = self.from_mesh(other)
+
+        offset = len(self.vertices)
+        self.vertices = np.concatenate([self.vertices, other.vertices])
+
+        for group_name, group in other.polygons.items():
+            self.add_polygons(group_name, {size: faces + offset for size, faces in group.items()})
+
+        for boundary_name, indices in other.boundaries.items():
+            indices = indices + offset
+            if boundary_name in self.boundaries:
+                indices = np.concatenate([self.boundaries[boundary_name], indices])
+            self.boundaries[boundary_name] = indices.astype(np.int32)
+
+        return self
+
+    def __add__(self, other):
+        mesh = self.copy()
+        mesh += other
+        return mesh
+
+    def mirror(self, axis="x"):
+        self.vertices[:, "xyz".index(axis)] *= -1
+        for group in self.polygons.values():
+            for size in group:
+                group[size] = group[size][:, ::-1]
+
+        return self
+
+    def round(self, places):
+        self.vertices = np.round(self.vertices, places)
+        return self
+
+    def get_triangles(self):
+        """
+        Get all faces (>2 vertices) as triangles (fan-triangulation)
+        :return: int array (M, 3)
+        """
+        triangles = [np.zeros((0, 3), dtype=np.int32)]
+        for faces in self.get_faces():
+            size = faces.shape[1]
+            for i in range(1, size - 1):
+                triangles.append(faces[:, [0, i, i+1]])
+
+        return np.concatenate(triangles)
+
+    def _write_obj(self, outfile, offset=0):
+        _write_rows(outfile, "v %.6f %.6f %.6f", self.vertices)
+
+        for group_name, group in self.polygons.items():
+            outfile.write("o {}\n".format(group_name))
+            for size, faces in group.items():
+                code = "l" if size == 2 else "f"
+                _write_rows(outfile, " ".join([code] + ["%d"] * size), faces + (offset + 1))
+
+    def export_obj(self, path=None, offset=0):
+        """
+        Export to wavefront obj, the file is written chunk by chunk
+        :return: path or the obj-string if no path is given
+        """
+        if path:
+            with open(path, "w") as outfile:
+                self._write_obj(outfile, offset)
+            return path
+        else:
+            out = io.StringIO()
+            self._write_obj(out, offset)
+            return out.getvalue()
+
+    def export_ply(self, path, binary=False):
+        """
+        Export faces (>2 vertices) to a ply-file (ascii or binary little endian)
+        """
+        faces = [group_faces for group_faces in self.get_faces() if group_faces.shape[1] > 2]
+        num_faces = sum(len(group_faces) for group_faces in faces)
+
+        header = [
+            "ply",
+            "format {} 1.0".format("binary_little_endian" if binary else "ascii"),
+            "comment exported using openglider",
+            "element vertex {}".format(len(self.vertices))
+        ]
+        header += ["property float32 {}".format(coord) for coord in ("x", "y", "z")]
+        header += [
+            "element face {}".format(num_faces),
+            "property list uchar uint vertex_indices",
+            "end_header"
+        ]
+
+        with open(path, "wb" if binary else "w") as outfile:
+            if binary:
+                outfile.write(("\n".join(header) + "\n").encode("ascii"))
+                _write_binary(outfile, self.vertices.astype("<f4"))
+                for group_faces in faces:
+                    size = group_faces.shape[1]
+                    records = np.empty(len(group_faces), dtype=[("size", "u1"), ("indices", "<u4", (size,))])
+                    records["size"] = size
+                    records["indices"] = group_faces
+                    _write_binary(outfile, records)
+            else:
+                outfile.write("\n".join(header) + "\n")
+                _write_rows(outfile, "%.6f %.6f %.6f", self.vertices)
+                for group_faces in faces:
+                    size = group_faces.shape[1]
+                    _write_rows(outfile, " ".join([str(size)] + ["%d"] * size), group_faces)
+
+        return path
+
+    def export_stl(self, path, chunksize=100000):
+        """
+        Export all faces (>2 vertices) as triangles to a binary stl-file
+        """
+        triangles = self.get_triangles()
+        record_type = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+        with open(path, "wb") as outfile:
+            outfile.write(b"exported using openglider".ljust(80, b" "))
+            outfile.write(np.array([len(triangles)], dtype="<u4").tobytes())
+
+            for start in range(0, len(triangles), chunksize):
+                points = self.vertices[triangles[start:start+chunksize]]
+                normals = np.cross(points[:, 1] - points[:, 0], points[:, 2] - points[:, 0])
+                lengths = np.linalg.norm(normals, axis=1)
+                lengths[lengths == 0] = 1
+
+                records = np.zeros(len(points), dtype=record_type)
+                records["normal"] = normals / lengths[:, np.newaxis]
+                records["vertices"] = points
+                outfile.write(records.tobytes())
+
+        return path
+
+    def export_dxf(self, path=None, version="AC1021"):
+        import ezdxf
+        import openglider.mesh.dxf_colours as dxfcolours
+        dwg = ezdxf.new(dxfversion=version)
+        ms = dwg.modelspace()
+        for poly_group_name, group in self.polygons.items():
+            color = dxfcolours.get_dxf_colour_code(*Mesh.parse_color_code(poly_group_name))
+            name = poly_group_name.replace("#", "_")
+            dwg.layers.new(name=name, dxfattribs={"color": color})
+
+            faces = [faces for size, faces in group.items() if size > 2]
+            if faces:
+                # only use the vertices of this group
+                indices = np.concatenate([face.flatten() for face in faces])
+                used_vertices, new_indices = np.unique(indices, return_inverse=True)
+
+                faces_new = []
+                start = 0
+                for face in faces:
+                    end = start + face.size
+                    faces_new += new_indices[start:end].reshape(face.shape).tolist()
+                    start = end
+
+                logger.info(f"Exporting {len(faces_new)} faces")
+                mesh_dxf = ms.add_mesh({"layer": name})
+                with mesh_dxf.edit_data() as mesh_data:
+                    mesh_data.vertices = self.vertices[used_vertices].tolist()
+                    mesh_data.faces = faces_new
+
+            if 2 in group:
+                for line in self.vertices[group[2]].tolist():
+                    ms.add_polyline3d(line, dxfattribs={"layer": name})
+
+        if path is not None:
+            dwg.saveas(path)
+        return dwg
@@ -294,31 +294,8 @@ class Mesh(object):
     __from_json__ = from_indexed
 
     def export_obj(self, path=None, offset=0):
-        vertices, polygons, boundaries = self.get_indexed()
-        out = ""
-
-        for vertex in vertices:
-            out += "v {:.6f} {:.6f} {:.6f}\n".format(*vertex)
-
-        for polygon_group_name, polygons in polygons.items():
-            out += "o {}\n".format(polygon_group_name)
-            for obj in polygons:
-                if len(obj) == 2:
-                    # line
-                    code = "l"
-                else:
-                    # face
-                    code = "f"
-
-                out += " ".join([code] + [str(x+offset+1) for x in obj])
-                out += "\n"
-
-        if path:
-            with open(path, "w") as outfile:
-                outfile.write(out)
-            return path
-        else:
-            return out
+        from openglider.mesh.array_mesh import ArrayMesh
+        return ArrayMesh.from_mesh(self).export_obj(path, offset)
 
     @staticmethod
     def parse_color_code(string):
@@ -366,66 +343,13 @@ class Mesh(object):
             dwg.saveas(path)
         return dwg
 
-    def export_ply(self, path):
-        vertices, polygons, boundaries = self.get_indexed()
-
-        material_lines = []
-        panels_lines = []
-
-        for i, polygon_group_name in enumerate(polygons):
-            color = self.parse_color_code(polygon_group_name)
-
-            color_str = " {} {} {} 1".format(*color)
-
-            material_lines.append(" ".join([color_str]*3))
-
-            for obj in polygons[polygon_group_name]:
-                if len(obj) > 2:
-                    out_str = str(len(obj))
-                    for x in obj:
-                        out_str += " {}".format(x)
-                    out_str += " {}".format(i)
-                    panels_lines.append(out_str)
-
-        with open(path, "w") as outfile:
-            outfile.write("ply\n")
-            outfile.write("format ascii 1.0\n")
-            outfile.write("comment exported using openglider\n")
-
-            outfile.write("element vertex {}\n".format(len(vertices)))
-            for coord in ("x", "y", "z"):
-                outfile.write("property float32 {}\n".format(coord))
-
-
-            # outfile.write("element material {}\n".format(len(material_lines)))
-            # outfile.write("property ambient_red uchar\n")
-            # outfile.write("property ambient_green uchar\n")
-            # outfile.write("property ambient_blue uchar\n")
-            # outfile.write("property ambient_coeff float\n")
-            # outfile.write("property diffuse_red uchar\n")
-            # outfile.write("property diffuse_green uchar\n")
-            # outfile.write("property diffuse_blue uchar\n")
-            # outfile.write("property diffuce_coeff float\n")
-            # outfile.write("property specular_red uchar\n")
-            # outfile.write("property specular_green uchar\n")
-            # outfile.write("property specular_blue uchar\n")
-            # outfile.write("property specular_coeff float\n")
-
-            outfile.write("element face {}\n".format(len(panels_lines)))
-            outfile.write("property list uchar uint vertex_indices\n")
-            #outfile.write("property material_index int\n")
+    def export_ply(self, path, binary=False):
+        from openglider.mesh.array_mesh import ArrayMesh
+        return ArrayMesh.from_mesh(self).export_ply(path, binary=binary)
 
-            outfile.write("end_header\n")
-
-            for vertex in vertices:
-                outfile.write("{:.6f} {:.6f} {:.6f}\n".format(*vertex))
-
-            for material_line in material_lines:
-                outfile.write(material_line + "\n")
-
-            for panel_line in panels_lines:
-                #print(panel_line)
-                outfile.write(panel_line + "\n")
+    def export_stl(self, path):
+        from openglider.mesh.array_mesh import ArrayMesh
+        return ArrayMesh.from_mesh(self).export_stl(path)
 
     def export_collada(self):
         # not yet working
@@ -483,42 +407,79 @@ class Mesh(object):
     # def __iadd__(self, other):
     #     self = self + other
     @staticmethod
-    def _find_duplicates(nodes):
-        print("jojo1")
+    def _find_duplicates(nodes, tolerance=None):
+        """
+        Find nodes at the same position (every coordinate within tolerance) using a kd-tree.
+        Each duplicate is mapped to the first matching node of the list.
+        :return: {duplicate: replacement}, statistics
+        """
+        from scipy.spatial import cKDTree
+
+        if tolerance is None:
+            tolerance = Vertex.dmin
+
+        # the same vertex might be part of multiple boundaries
+        unique_nodes = list({id(node): node for node in nodes}.values())
         duplicates = {}
-        for i, node1 in enumerate(nodes[:-1]):
-            if node1 not in duplicates:
-                for j, node2 in enumerate(nodes[i:]):
-                    if node1 is not node2 and node1.is_equal(node2):
-                        duplicates[node2] = node1
-        
-        return duplicates
-
-    def delete_duplicates(self, boundaries=None):
+        max_distance = 0.
+
+        if len(unique_nodes) > 1:
+            points = np.array([list(node) for node in unique_nodes], dtype=float)
+            tree = cKDTree(points)
+            pairs = tree.query_pairs(r=tolerance, p=np.inf, output_type="ndarray")
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+            replacements = {}
+            for i, j in pairs.tolist():
+                if i not in replacements and j not in replacements:
+                    replacements[j] = i
+
+            if replacements:
+                indices = np.array(list(replacements.items()))
+                distances = np.linalg.norm(points[indices[:, 0]] - points[indices[:, 1]], axis=1)
+                max_distance = float(distances.max())
+
+            duplicates = {unique_nodes[j]: unique_nodes[i] for j, i in replacements.items()}
+
+        statistics = {
+            "nodes": len(unique_nodes),
+            "merged": len(duplicates),
+            "max_distance": max_distance
+        }
+
+        return duplicates, statistics
+
+    def delete_duplicates(self, boundaries=None, tolerance=None):
         """
         :param boundaries: list of boundary names to be joined (None->all)
+        :param tolerance: maximum coordinate difference for merging (default: Vertex.dmin)
         :return: Mesh (self)
         """
+        self.merge_duplicates(boundaries, tolerance)
+        return self
 
+    def merge_duplicates(self, boundaries=None, tolerance=None):
+        """
+        Join the duplicated nodes of the boundaries
+        :param boundaries: list of boundary names to be joined (None->all)
+        :param tolerance: maximum coordinate difference for merging (default: Vertex.dmin)
+        :return: {replaced_node: replacement}, statistics {"nodes", "merged", "max_distance"}
+        """
         boundaries = boundaries or self.boundary_nodes.keys()
-        replace_dict = {}
-        all_boundary_nodes = sum([self.boundary_nodes[name] for name in boundaries], [])
+        all_boundary_nodes = [node for name in boundaries for node in self.boundary_nodes[name]]
 
-        replace_dict = self._find_duplicates(all_boundary_nodes)
+        replace_dict, statistics = self._find_duplicates(all_boundary_nodes, tolerance)
+        logger.info("merged {merged} of {nodes} boundary nodes (max distance: {max_distance})".format(**statistics))
 
         for node, replacement in replace_dict.items():
             replacement.attributes.update(node.attributes)
 
         for boundary_name, boundary_nodes in self.boundary_nodes.items():
-            to_remove = []
-            for i, node in enumerate(boundary_nodes):
-                if node in replace_dict:
-                    to_remove.append(i)
-            for i in to_remove[::-1]:
-                boundary_nodes.pop(i)
+            remaining = [node for node in boundary_nodes if node not in replace_dict]
+            count = len(boundary_nodes) - len(remaining)
+            boundary_nodes[:] = remaining
 
-            if to_remove:
-                count = len(to_remove)
+            if count:
                 logger.info(f"deleted {count} duplicated Vertices for boundary group <{boundary_name}> ")
 
         for polygon in self.all_polygons:
@@ -540,7 +501,8 @@ class Mesh(object):
             for i, node in enumerate(self.boundary_nodes[boundary_name]):
                 if node not in vertices:
                     logger.warning(f"uiuiui, {node} in replace dict is not in vertices")
-        return self
+
+        return replace_dict, statistics
 
     def polygon_size(self):
         size_min = float("inf")
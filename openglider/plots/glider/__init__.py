@@ -1,10 +1,27 @@
 import collections
+import concurrent.futures
+import concurrent.futures.process
+import logging
+import pickle
 
 from openglider.vector.drawing import Layout
 from openglider.plots.glider.cell import CellPlotMaker
 from openglider.plots.glider.ribs import RibPlot, SingleSkinRibPlot
 from openglider.plots.glider.config import PatternConfig, OtherPatternConfig
 
+logger = logging.getLogger(__name__)
+
+
+def _unwrap_cell(cellplotmaker):
+    """
+    Get lower panels, upper panels, dribs and straps of a cell.
+    Module-level to be usable with a process pool.
+    """
+    return (cellplotmaker.get_panels_lower(),
+            cellplotmaker.get_panels_upper(),
+            cellplotmaker.get_dribs(),
+            cellplotmaker.get_straps())
+
 
 class PlotMaker(object):
     CellPlotMaker = CellPlotMaker
@@ -47,6 +64,26 @@ class PlotMaker(object):
 
         return self._cellplotmakers[cell]
 
+    def get_cell_patterns(self, cells=None, processes=None):
+        """
+        Get (panels_lower, panels_upper, dribs, straps) for every cell, in the order of the cells.
+        :param cells: list of cells (default: all cells of the glider)
+        :param processes: number of worker processes (None/1 -> sequential, 0 -> one per cpu)
+        """
+        if cells is None:
+            cells = self.glider_3d.cells
+        cellplotmakers = [self._get_cellplotmaker(cell) for cell in cells]
+
+        if processes is not None and processes != 1:
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=processes or None) as executor:
+                    return list(executor.map(_unwrap_cell, cellplotmakers))
+            except (concurrent.futures.process.BrokenProcessPool, pickle.PicklingError, OSError) as e:
+                # no usable process pool: fall back, errors of the unwrapping itself are raised
+                logger.warning("parallel unwrapping failed ({!r}), falling back to sequential".format(e))
+
+        return [_unwrap_cell(cellplotmaker) for cellplotmaker in cellplotmakers]
+
     def get_panels(self):
         self.panels.clear()
         panels_upper = []
@@ -54,10 +91,14 @@ class PlotMaker(object):
 
         for cell in self.glider_3d.cells:
             pm = self._get_cellplotmaker(cell)
-            lower = pm.get_panels_lower()
-            upper = pm.get_panels_upper()
-            panels_lower.append(Layout.stack_column(lower, self.config.patterns_align_dist_y))
-            panels_upper.append(Layout.stack_column(upper, self.config.patterns_align_dist_y))
+            panels_lower.append(pm.get_panels_lower())
+            panels_upper.append(pm.get_panels_upper())
+
+        return self._set_panels(panels_lower, panels_upper)
+
+    def _set_panels(self, panels_lower, panels_upper):
+        panels_lower = [Layout.stack_column(lower, self.config.patterns_align_dist_y) for lower in panels_lower]
+        panels_upper = [Layout.stack_column(upper, self.config.patterns_align_dist_y) for upper in panels_upper]
 
         if self.config.layout_seperate_panels:
             layout_lower = Layout.stack_row(panels_lower, self.config.patterns_align_dist_x)
@@ -159,11 +200,24 @@ class PlotMaker(object):
 
         return Layout.stack_column(all_layouts, 0.01, center_x=False)
 
-    def unwrap(self):
-        self.get_panels()
+    def unwrap(self, processes=None):
+        """
+        Create all patterns.
+        :param processes: number of worker processes for the cell patterns (None/1 -> sequential, 0 -> one per cpu)
+        """
+        cells = self.glider_3d.cells
+        cell_patterns = self.get_cell_patterns(cells, processes)
+
+        self._set_panels([patterns[0] for patterns in cell_patterns],
+                         [patterns[1] for patterns in cell_patterns])
         self.get_ribs()
-        self.get_dribs()
-        self.get_straps()
+
+        self.dribs.clear()
+        self.straps.clear()
+        for cell, (_, _, dribs, straps) in zip(cells, cell_patterns):
+            self.dribs[cell] = dribs
+            self.straps[cell] = straps
+
         return self
 
     def get_all_parts(self):
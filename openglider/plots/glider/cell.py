@@ -11,6 +11,7 @@ from openglider.vector.drawing import PlotPart, Layout
 import openglider.vector.projection as projection
 from openglider.vector import normalize, norm
 import openglider.utils
+from openglider.utils.instrumentation import timed
 
 
 class PanelPlot(object):
@@ -437,11 +438,8 @@ class DribPlot(object):
     def _get_outer(self) -> (PolyLine2D, PolyLine2D):
         if self._left_out is None:
             left, right = self._get_inner()
-            left_out = left.copy()
-            right_out = right.copy()
-
-            left_out.add_stuff(-self.config.allowance_general)
-            right_out.add_stuff(self.config.allowance_general)
+            allowance = self.config.allowance_general
+            left_out, right_out = PolyLine2D.add_stuff_multiple([left.copy(), right.copy()], [-allowance, allowance])
             self._left_out = left_out
             self._right_out = right_out
 
@@ -612,14 +610,13 @@ class CellPlotMaker:
 
     def _get_flatten_cell(self):
         if self._flattened_cell is None:
-            flattened_cell = self.cell.get_flattened_cell(self.config.midribs)
+            # the flattening is shared (cached) by the cell, don't modify it
+            flattened_cell = dict(self.cell.get_flattened_cell(self.config.midribs))
 
             left_bal, right_bal = flattened_cell["ballooned"]
 
-            outer_left = left_bal.copy().add_stuff(-self.config.allowance_general)
-            outer_right = right_bal.copy().add_stuff(self.config.allowance_general)
-
-            outer_orig = [outer_left, outer_right]
+            allowance = self.config.allowance_general
+            outer_orig = PolyLine2D.add_stuff_multiple([left_bal.copy(), right_bal.copy()], [-allowance, allowance])
             outer = [l.copy().check() for l in outer_orig]
 
             flattened_cell["outer"] = outer
@@ -666,6 +663,7 @@ class CellPlotMaker:
             panel.cut_front["amount_3d"] = get_amount(panel.cut_front)
             panel.cut_back["amount_3d"] = get_amount(panel.cut_back)
 
+    @timed()
     def get_panels(self, panels=None):
         cell_panels = []
         flattened_cell = self._get_flatten_cell()
@@ -1,4 +1,9 @@
+import collections
 import copy
+import functools
+import inspect
+import itertools
+import threading
 import time
 
 import numpy as np
@@ -6,6 +11,16 @@ import numpy as np
 import openglider
 
 cache_instances = []
+_versions = itertools.count(1)
+# bumped by clear_cache, instance caches of an older generation are dropped on access
+_cache_generation = 0
+
+
+def next_version():
+    """
+    Get a new (process-wide unique) version number for a mutated container
+    """
+    return next(_versions)
 
 
 class CachedObject(object):
@@ -31,6 +46,32 @@ class CachedObject(object):
         return rep
 
 
+class InstanceCache(dict):
+    """
+    Per-instance storage of cached values.
+    The values are not pickled (or deep-copied) and get recalculated on demand.
+    """
+    def __init__(self):
+        super(InstanceCache, self).__init__()
+        self.generation = _cache_generation
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+
+def get_instance_cache(instance):
+    """
+    The InstanceCache of an object (created on first use, emptied after clear_cache)
+    """
+    cache = getattr(instance, "_cache", None)
+    if cache is None:
+        cache = instance._cache = InstanceCache()
+    elif cache.generation != _cache_generation:
+        cache.clear()
+        cache.generation = _cache_generation
+    return cache
+
+
 def cached_property(*hashlist):
     #@functools.wraps
     class CachedProperty(object):
@@ -42,6 +83,9 @@ def cached_property(*hashlist):
 
             self.hashlist = hashlist
             self.cache = {}
+            self.name = getattr(fget, "__qualname__", fget.__name__)
+            self.hits = 0
+            self.misses = 0
 
             global cache_instances
             cache_instances.append(self)
@@ -50,29 +94,184 @@ def cached_property(*hashlist):
             if not openglider.config["caching"]:
                 return self.function(parentclass)
             else:
-                if not hasattr(parentclass, "_cache"):
-                    parentclass._cache = {}
-
-                cache = parentclass._cache
+                cache = get_instance_cache(parentclass)
                 dahash = hash_attributes(parentclass, self.hashlist)
                 # Return cached or recalc if hashes differ
                 if self not in cache or cache[self]['hash'] != dahash:
+                    self.misses += 1
                     res = self.function(parentclass)
                     cache[self] = {
                         "hash": dahash,
                         "value": res
                     }
+                else:
+                    self.hits += 1
 
                 return cache[self]["value"]
 
     return CachedProperty
 
 
+class CachedFunction(object):
+    """
+    Method-cache for hashable arguments, see cached_function
+    """
+    def __init__(self, function, hashlist):
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.signature = inspect.signature(function)
+        self.hashlist = hashlist
+        self.cache = {}
+        self.name = getattr(function, "__qualname__", function.__name__)
+        self.hits = 0
+        self.misses = 0
+
+        cache_instances.append(self)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return functools.partial(self.__call__, instance)
+
+    def __call__(self, instance, *args, **kwargs):
+        if not openglider.config["caching"]:
+            return self.function(instance, *args, **kwargs)
+
+        instance_cache = get_instance_cache(instance)
+
+        dahash = hash_attributes(instance, self.hashlist)
+        cache = instance_cache.get(self)
+        if cache is None or cache["hash"] != dahash:
+            cache = instance_cache[self] = {
+                "hash": dahash,
+                "values": {}
+            }
+
+        key = self.get_key(instance, *args, **kwargs)
+        if key not in cache["values"]:
+            self.misses += 1
+            cache["values"][key] = self.function(instance, *args, **kwargs)
+        else:
+            self.hits += 1
+
+        return cache["values"][key]
+
+
+    def get_key(self, instance, *args, **kwargs):
+        """
+        Cache key of the arguments, the same for positional, keyword and default arguments:
+        f(3), f(numribs=3) and f() (with numribs=3 as default) share the result
+        """
+        arguments = self.signature.bind(instance, *args, **kwargs)
+        arguments.apply_defaults()
+
+        key = []
+        for name, value in list(arguments.arguments.items())[1:]:
+            if self.signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+                value = tuple(sorted(value.items()))
+            key.append(value)
+
+        return tuple(key)
+
+
+def cached_function(*hashlist):
+    """
+    Like cached_property, but for methods: results are stored per (hashable) arguments
+    and all of them are dropped when the hash of the attributes in hashlist changes.
+    """
+    def decorator(function):
+        return CachedFunction(function, hashlist)
+
+    return decorator
+
+
+class BoundedCache(object):
+    """
+    Process-wide cache for the results of pure functions with hashable keys.
+    The least recently used values are dropped once there are more than maxsize.
+    """
+    def __init__(self, name, maxsize=128):
+        self.name = name
+        self.maxsize = maxsize
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        cache_instances.append(self)
+
+    def get(self, key, function, *args):
+        """
+        Return the cached value for key or store function(*args)
+        """
+        if not openglider.config["caching"]:
+            return function(*args)
+
+        with self._lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        value = function(*args)
+        with self._lock:
+            self.misses += 1
+            self.cache[key] = value
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+        return value
+
+
 def clear_cache():
+    """
+    Drop all cached values: the shared caches and the values of
+    cached_property/cached_function stored on the objects
+    """
+    global _cache_generation
+    _cache_generation += 1
     for instance in cache_instances:
         instance.cache.clear()
 
 
+def reset_cache_statistics():
+    for instance in cache_instances:
+        instance.hits = 0
+        instance.misses = 0
+
+
+def get_cache_statistics():
+    """
+    Get hit/miss counts for all cached properties that have been accessed:
+    {"Rib.profile_3d": {"hits": 10, "misses": 2}, ...}
+    """
+    statistics = {}
+    for instance in cache_instances:
+        if instance.hits or instance.misses:
+            stats = statistics.setdefault(instance.name, {"hits": 0, "misses": 0})
+            stats["hits"] += instance.hits
+            stats["misses"] += instance.misses
+
+    return statistics
+
+
+def cache_report():
+    """
+    Return a Table with the hits/misses of all cached properties (most misses first)
+    """
+    from openglider.utils.table import Table
+
+    table = Table()
+    table.insert_row(["Property", "Hits", "Misses", "Hit-Rate"])
+    statistics = get_cache_statistics()
+    for name in sorted(statistics, key=lambda name: -statistics[name]["misses"]):
+        hits = statistics[name]["hits"]
+        misses = statistics[name]["misses"]
+        table.insert_row([name, hits, misses, hits / (hits + misses)])
+
+    return table
+
+
 def recursive_getattr(obj, attr):
     """
     Recursive Attribute-getter
@@ -91,7 +290,7 @@ def c_mul(a, b):
     C type multiplication
     http://stackoverflow.com/questions/6008026/how-hash-is-implemented-in-python-3-2
     """
-    return eval(hex((int(a) * b) & 0xFFFFFFFF)[:-1])
+    return ((int(a) * b) & 0xFFFFFFFF) >> 4
 
 
 def hash_attributes(class_instance, hashlist):
@@ -108,10 +307,8 @@ def hash_attributes(class_instance, hashlist):
             if openglider.config['debug']:
                 print("bad cache: "+str(class_instance.__class__.__name__)+" attribute: "+attribute)
 
-            hash_func = getattr(el, "__hash__", None)
-            hash_func = None
-            if hash_func is not None:
-                thahash = el.__hash__()
+            if isinstance(el, np.ndarray):
+                thahash = hash((el.shape, el.tobytes()))
             else:
                 try:
                     thahash = hash(frozenset(el))
@@ -128,32 +325,75 @@ def hash_attributes(class_instance, hashlist):
 class HashedList(CachedObject):
     """
     Hashed List to use cached properties
+
+    Every mutation through the data-setter or __setitem__ bumps a version
+    number. With config["cache_mode"] == "version" (default) the hash is
+    derived from that version instead of the content.
+    In-place changes on the underlying array (list.data[i] = ...) are not
+    tracked in either mode, use list[i] = ... instead.
+
+    Copies share their arrays (copy-on-write): a shared array is set read-only
+    and replaced by a copy on the next list[i] = ... of either list.
+    This applies to the original as well: after list.copy() (or a deepcopy of an
+    object holding the list, e.g. glider.copy()) in-place writes on the array
+    (list.data[i, j] += x) raise a ValueError. Use list[i] = ... or assign
+    list.data, both lists stay writable that way.
     """
     name = "unnamed"
     def __init__(self, data, name=None):
         self._data = None
         self._hash = None
+        self._version = 0
         self.data = data
         self.name = name or getattr(self, 'name', None)
 
     def __json__(self):
         # attrs = self.__init__.func_code.co_varnames
         # return {key: getattr(self, key) for key in attrs if key != 'self'}
-        return {"data": self.data.tolist(), "name": self.name}
+        return {"data": self.data, "name": self.name}
 
     def __getitem__(self, item):
         return self.data[item]
 
     def __setitem__(self, key, value):
+        if not self._data.flags.writeable:
+            self._data = self._data.copy()
         self.data[key] = np.array(value)
         self._hash = None
+        self._version = next_version()
+
+    def __deepcopy__(self, memo):
+        new = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new
+        for key, value in self.__dict__.items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                # share the buffer, both sides copy before writing
+                value.flags.writeable = False
+                new.__dict__[key] = value
+            else:
+                new.__dict__[key] = copy.deepcopy(value, memo)
+
+        new._version = next_version()
+        return new
+
+    def __setstate__(self, state):
+        # versions are only unique within one process
+        self.__dict__.update(state)
+        self._hash = None
+        self._version = next_version()
 
     def __hash__(self):
         if self._hash is None:
-            self._hash = hash(str(self.data))
-            #self._hash = hash("{}/{}".format(id(self), time.time()))
+            if openglider.config["cache_mode"] == "version":
+                self._hash = hash(self._version)
+            else:
+                self._hash = hash(str(self.data))
         return self._hash
 
+    @property
+    def version(self):
+        return self._version
+
     def __len__(self):
         return len(self.data)
 
@@ -174,13 +414,15 @@ class HashedList(CachedObject):
     @data.setter
     def data(self, data):
         if data is not None:
-            data = list(data)  # np.array(zip(x,y)) is shit
+            if not isinstance(data, np.ndarray):
+                data = list(data)  # np.array(zip(x,y)) is shit
             self._data = np.array(data)
             #self._data = np.array(data)
             #self._data = [np.array(vector) for vector in data]  # 1,5*execution time
             self._hash = None
         else:
             self._data = []
+        self._version = next_version()
 
     def copy(self):
         return copy.deepcopy(self)
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Lightweight timing instrumentation for the major stages of the pipeline.
+
+Functions are registered with the @timed decorator (or blocks with "with stage(name):"),
+nothing is recorded unless a Recorder is active:
+
+    with record(allocations=True) as recorder:
+        glider_2d.get_glider_3d()
+
+    print(recorder)                                # table: count / total / self time / allocations
+    recorder.get_report()                          # same as list of dicts
+    recorder.export_chrome_trace("trace.json")     # open in chrome://tracing or perfetto
+
+When no recorder is active a decorated function costs one extra function call.
+Work done in other processes (PlotMaker.unwrap(processes=...)) is not recorded.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# name -> function of all instrumented functions
+registry = {}
+
+_recorder = None
+
+
+class _Measurement(object):
+    __slots__ = ("name", "start", "child_time")
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.child_time = 0.
+
+
+class Recorder(object):
+    """
+    Collect wall time, call counts and (optionally) allocations per instrumented name.
+    "self" time excludes the time spent in nested instrumented calls.
+    """
+    def __init__(self, allocations=False, trace=True):
+        """
+        :param allocations: track the net allocated memory with tracemalloc (slow)
+        :param trace: keep every single call for the chrome-trace export
+        """
+        self.allocations = allocations
+        self.trace = trace
+        self.stats = {}  # name -> [count, total, self, max, allocated]
+        self.events = []
+        self.start_time = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _get_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        stack = self._get_stack()
+        memory = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        measurement = _Measurement(name, time.perf_counter())
+        stack.append(measurement)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            duration = end - measurement.start
+            allocated = tracemalloc.get_traced_memory()[0] - memory if self.allocations else 0
+            if stack:
+                stack[-1].child_time += duration
+            self._add(measurement, duration, allocated)
+
+    def _add(self, measurement, duration, allocated):
+        with self._lock:
+            entry = self.stats.get(measurement.name)
+            if entry is None:
+                entry = self.stats[measurement.name] = [0, 0., 0., 0., 0]
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] += duration - measurement.child_time
+            entry[3] = max(entry[3], duration)
+            entry[4] += allocated
+
+            if self.trace:
+                self.events.append((measurement.name, measurement.start, duration,
+                                    threading.get_ident(), allocated))
+
+    def get_report(self):
+        """
+        :return: [{name, count, total, self, max, allocated}] sorted by self-time
+        """
+        report = []
+        for name, (count, total, self_time, maximum, allocated) in self.stats.items():
+            report.append({
+                "name": name,
+                "count": count,
+                "total": total,
+                "self": self_time,
+                "max": maximum,
+                "allocated": allocated
+            })
+        report.sort(key=lambda entry: -entry["self"])
+        return report
+
+    def get_chrome_trace(self):
+        """
+        Trace-event format (complete events), times in microseconds
+        """
+        pid = os.getpid()
+        events = []
+        for name, start, duration, thread_id, allocated in self.events:
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.start_time) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": thread_id
+            }
+            if self.allocations:
+                event["args"] = {"allocated": allocated}
+            events.append(event)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as outfile:
+            json.dump(self.get_chrome_trace(), outfile)
+        return path
+
+    def __str__(self):
+        lines = ["{:>8} {:>10} {:>10} {:>10} {:>12}  {}".format(
+            "count", "total", "self", "max", "allocated", "name")]
+        for entry in self.get_report():
+            lines.append("{count:>8} {total:>9.4f}s {self:>9.4f}s {max:>9.4f}s {allocated:>12}  {name}".format(**entry))
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def record(allocations=False, trace=True):
+    """
+    Activate a Recorder for the enclosed block
+    """
+    global _recorder
+    recorder = Recorder(allocations=allocations, trace=trace)
+    previous = _recorder
+    started_tracemalloc = allocations and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+
+    _recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _recorder = previous
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+
+def get_recorder():
+    return _recorder
+
+
+@contextlib.contextmanager
+def _null_context():
+    # contextlib.nullcontext is python >= 3.7
+    yield
+
+
+def stage(name):
+    """
+    Context manager to instrument a block of code: with stage("name"): ...
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _null_context()
+    return recorder.measure(name)
+
+
+def timed(name=None):
+    """
+    Decorator to instrument a function, the default name is module.qualname
+    """
+    def decorator(function):
+        measure_name = name or "{}.{}".format(function.__module__, function.__qualname__)
+        registry[measure_name] = function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return function(*args, **kwargs)
+            with recorder.measure(measure_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+    return decorator
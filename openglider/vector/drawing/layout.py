@@ -8,6 +8,7 @@ import svgwrite.shapes
 
 from openglider.vector.drawing.part import PlotPart
 from openglider.utils.css import get_material_color, normalize_class_names
+from openglider.utils.instrumentation import timed
 from openglider.vector import PolyLine2D
 from openglider.vector.text import Text
 
@@ -516,6 +517,7 @@ class Layout(object):
 
         return drawing.tostring()
 
+    @timed()
     def export_svg(self, path, add_styles=False):
         drawing = self.get_svg_drawing()
 
@@ -525,6 +527,7 @@ class Layout(object):
         with open(path, "w") as outfile:
             drawing.write(outfile)
 
+    @timed()
     def export_dxf(self, path, dxfversion="AC1015"):
         import ezdxf
         drawing = ezdxf.new(dxfversion=dxfversion)
@@ -566,6 +569,7 @@ class Layout(object):
         "R": ["stitches"]
     }
 
+    @timed()
     def export_ntv(self, path):
         filename = os.path.split(path)[-1]
 
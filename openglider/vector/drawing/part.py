@@ -142,8 +142,7 @@ class PlotPart(object):
         if layer:
             for line in layer:
                 if line:
-                    values = [p[axis] for p in line]
-                    start = max(start, max(values))
+                    start = max(start, line.get_bbox()[1][axis])
         return start
 
     def min_function(self, axis, layer):
@@ -151,8 +150,7 @@ class PlotPart(object):
         if layer:
             for line in layer:
                 if line:
-                    values = [p[axis] for p in line]
-                    start = min(start, min(values))
+                    start = min(start, line.get_bbox()[0][axis])
         return start
 
     @property
@@ -45,6 +45,14 @@ def rangefrom(maxl, startpoint=0):
         j += 1
 
 
+def rangefrom_array(maxl, startpoint=0):
+    """
+    Array-version of rangefrom: all indices of range(maxl) in the same order
+    """
+    distance = np.arange(maxl) - startpoint
+    return np.lexsort((distance < 0, np.abs(distance)))
+
+
 def rotation_3d(angle, axis=None):
     """
     3D-Rotation Matrix for (angle[rad],[axis(x,y,z)])
@@ -82,6 +90,26 @@ def cut(p1, p2, p3, p4):
     return p1 + k * (p2 - p1), k, l
 
 
+def cut_array(p1, p2, p3, p4):
+    """
+    Vectorized 2D-Linear Cut for arrays of points (broadcasted against each other)
+    Solves p1+k*(p2-p1)==p3+l*(p4-p3) in closed form.
+    Returns (k, l); both are nan for parallel lines
+    """
+    p1, p2, p3, p4 = [np.asarray(p, dtype=float) for p in (p1, p2, p3, p4)]
+    d1 = p2 - p1
+    d2 = p3 - p4
+    rhs = p3 - p1
+
+    det = d1[..., 0] * d2[..., 1] - d2[..., 0] * d1[..., 1]
+    det = np.where(det == 0, np.nan, det)
+
+    k = (rhs[..., 0] * d2[..., 1] - d2[..., 0] * rhs[..., 1]) / det
+    l = (d1[..., 0] * rhs[..., 1] - rhs[..., 0] * d1[..., 1]) / det
+
+    return k, l
+
+
 def set_dimension(array, dim=3):
     array = np.array(array)
     if len(array.shape) == 1:
@@ -1,3 +1,6 @@
+import numpy as np
+
+from openglider.utils.cache import cached_property
 from openglider.vector import PolyLine2D
 
 
@@ -6,19 +9,60 @@ class Interpolation(PolyLine2D):
         super(Interpolation, self).__init__(data, name)
         self.extrapolate = extrapolate
 
-    def __call__(self, xval):
-        last_point = self.data[0]
-        for index, point in enumerate(self.data):
-            if index == 0:
-                continue
+    @cached_property('self')
+    def _segments(self):
+        """
+        x-values, y-values and whether the x-values are increasing (binary search possible)
+        """
+        data = np.asarray(self.data, dtype=float)
+        x_values = data[:, 0]
+        y_values = data[:, 1]
+        increasing = bool(np.all(x_values[1:] >= x_values[:-1]))
+        return x_values, y_values, increasing
+
+    def _get_segments(self, xval):
+        """
+        Index of the right point of the segment for every value:
+        the first point with x > xval, limited to the first/last segment (extrapolation).
+        Without extrapolation (unsorted data) the first increasing segment containing the value.
+        """
+        x_values, _, increasing = self._segments
+        last = len(x_values) - 1
 
-            lower_bound = self.extrapolate or last_point[0] < xval
-            end_of_list = self.extrapolate and index == len(self.data) - 1
+        if increasing:
+            index = np.searchsorted(x_values, xval, side="right")
+        elif self.extrapolate:
+            larger = xval[..., np.newaxis] < x_values[1:]
+            index = np.where(larger.any(axis=-1), larger.argmax(axis=-1) + 1, last)
+        else:
+            x_0 = x_values[:-1]
+            x_1 = x_values[1:]
+            inside = (x_0 < x_1) & (x_0 <= xval[..., np.newaxis]) & (xval[..., np.newaxis] <= x_1)
+            if not np.all(inside.any(axis=-1)):
+                raise ValueError("Value(s) {} outside of the interpolation range".format(xval))
+            index = inside.argmax(axis=-1) + 1
+
+        return np.clip(index, 1, last)
+
+    def __call__(self, xval):
+        """
+        Linear interpolation for a value or an array of values.
+        Outside of the range the first/last segment is extrapolated,
+        a ValueError is raised if extrapolate is False.
+        """
+        x_values, y_values, _ = self._segments
+        scalar = np.ndim(xval) == 0
+        xval = np.asarray(xval, dtype=float)
 
-            if (lower_bound and xval < point[0]) or end_of_list:
-                d_x = point[0] - last_point[0]
-                return last_point[1] + (xval-last_point[0])/d_x * (point[1] - last_point[1])
+        if not self.extrapolate and np.any((xval < x_values.min()) | (xval > x_values.max())):
+            raise ValueError("Value(s) {} outside of the interpolation range".format(xval))
 
-            last_point = point
+        index = self._get_segments(xval)
+        x_0 = x_values[index-1]
+        y_0 = y_values[index-1]
+        d_x = x_values[index] - x_0
+        result = y_0 + (xval-x_0)/d_x * (y_values[index] - y_0)
 
-        raise Exception
+        if scalar:
+            return result[()]
+        return result
@@ -2,7 +2,7 @@ import numpy as np
 
 from openglider.utils import sign
 from openglider.utils.cache import cached_property, HashedList
-from openglider.vector.functions import norm, normalize, rangefrom, rotation_2d, cut
+from openglider.vector.functions import norm, normalize, rangefrom_array, rotation_2d, cut_array
 from openglider.utils.table import Table
 
 
@@ -16,7 +16,9 @@ class PolyLine(HashedList):
         elif isinstance(ik, slice):  # example: list[1.2:5.5:1]
             values = self.get_positions(ik.start, ik.stop, ik.step)
             #print(values, ik.start, ik.stop, ik.step, step, start_round, stop_round)
-            return PolyLine([self[i] for i in values])
+            return PolyLine(self.get_points(values))
+        elif isinstance(ik, np.ndarray):
+            return self.get_points(ik)
         else:
             if ik < 0:
                 k = ik
@@ -46,7 +48,7 @@ class PolyLine(HashedList):
 
     def add(self, other):
         new = self.copy()
-        new.data += other.data
+        new.data = new.data + other.data
         return new
 
     def get_table(self):
@@ -152,6 +154,76 @@ class PolyLine(HashedList):
                 break
         return length + norm(self[second] - self[first])
 
+    def get_points(self, iks):
+        """
+        Get the points for an array of (fractional) indices,
+        same as [self[ik] for ik in iks] (including extrapolation)
+        """
+        iks = np.asarray(iks, dtype=float)
+        data = self.data
+        num = len(data)
+        i = np.clip(np.floor(iks), 0, num - 2).astype(int)
+        k = iks - i
+        points = data[i] + k[..., np.newaxis] * (data[i + 1] - data[i])
+
+        # exact values for integer indices
+        exact = (k == 0) | (k == 1)
+        if exact.any():
+            points[exact] = data[(i + k)[exact].astype(int)]
+
+        return points
+
+    @cached_property('self')
+    def arc_lengths(self):
+        """
+        Cumulative length at every point: [0, l_0, l_0+l_1, ...]
+        """
+        return np.concatenate([[0.], np.cumsum(self.get_segment_lengthes())])
+
+    def get_arc_position(self, iks):
+        """
+        Get the length-position along the line for (an array of) ik-values.
+        Values before the start are negative, extrapolated values use the first/last segment.
+        """
+        iks = np.asarray(iks, dtype=float)
+        arc_lengths = self.arc_lengths
+        segment_lengths = np.diff(arc_lengths)
+        i = np.clip(np.floor(iks), 0, len(arc_lengths) - 2).astype(int)
+
+        return arc_lengths[i] + (iks - i) * segment_lengths[i]
+
+    def get_ik(self, arc_positions):
+        """
+        Inverse of get_arc_position: get the ik-values for (an array of) length-positions
+        """
+        arc_positions = np.asarray(arc_positions, dtype=float)
+        arc_lengths = self.arc_lengths
+        segment_lengths = np.diff(arc_lengths)
+        num_segments = len(segment_lengths)
+
+        i = np.searchsorted(arc_lengths, arc_positions, side="right") - 1
+        i = np.clip(i, 0, num_segments - 1)
+
+        # zero-length segments at the ends cannot be used for extrapolation
+        lengths = segment_lengths[i]
+        zero_length = lengths == 0
+        lengths = np.where(zero_length, 1., lengths)
+        k = np.where(zero_length, 0., (arc_positions - arc_lengths[i]) / lengths)
+
+        return i + k
+
+    def get_lengths(self, first, second):
+        """
+        Vectorized get_length: (normative) lengths between arrays of ik-values
+        """
+        return np.abs(self.get_arc_position(second) - self.get_arc_position(first))
+
+    def extend_array(self, start, lengths):
+        """
+        Vectorized extend: move from (an array of) starting points for (an array of) lengths
+        """
+        return self.get_ik(self.get_arc_position(start) + np.asarray(lengths, dtype=float))
+
     def get_segment_lengthes(self):
         return np.linalg.norm(self.get_segments(), axis=1)
 
@@ -165,8 +237,7 @@ class PolyLine(HashedList):
         scale ==  0: [0 , 1]
         scale == -1: [-1, 1]
         """
-        diff = self.get_segment_lengthes()
-        length = np.array([0] + np.cumsum(diff).tolist())
+        length = self.arc_lengths.copy()
         if scale in [0, -1]:
             length /= max(length)
             if scale == -1:
@@ -176,7 +247,7 @@ class PolyLine(HashedList):
     def scale(self, x, y=None):
         if y is None:
             y = x
-        self.data *= [x, y]
+        self.data = self.data * [x, y]
         return self
 
     def cutByPlane(self, point_vector, normal_vector):
@@ -196,6 +267,97 @@ class PolyLine(HashedList):
 
 
 
+def _normalize_rows(vectors):
+    """
+    Normalize an array of vectors (..., dim) along the last axis
+    """
+    lengths = np.linalg.norm(vectors, axis=-1)
+    if np.any(lengths == 0):
+        raise ValueError("Cannot normalize a vector of length 0")
+    return vectors / lengths[..., np.newaxis]
+
+
+def _rotate_rhs(vectors):
+    """
+    Rotate 2d-vectors (..., 2) by -90 degrees (heading rhs)
+    """
+    return np.stack([vectors[..., 1], -vectors[..., 0]], axis=-1)
+
+
+def _get_normvectors(data):
+    """
+    Normvectors for every point of the (stacked) lines data (..., n, 2)
+    """
+    directions = np.concatenate([
+        data[..., 1:2, :] - data[..., 0:1, :],
+        data[..., 2:, :] - data[..., :-2, :],
+        data[..., -1:, :] - data[..., -2:-1, :]
+    ], axis=-2)
+    return _rotate_rhs(_normalize_rows(directions))
+
+
+def _get_norm_segment_vectors(data):
+    """
+    Normvectors for every segment of the (stacked) lines data (..., n, 2)
+    """
+    return _rotate_rhs(_normalize_rows(np.diff(data, axis=-2)))
+
+
+def _get_offset(data, amount):
+    """
+    Offset (stacked) lines data (..., n, 2) sideways for amount (broadcastable to data.shape[:-2]).
+    At 180 degree turns two points are needed, the second one is returned separately.
+    :return: offset points (..., n, 2), second points (..., n, 2), mask of the second points (..., n)
+    """
+    coresize = 1e-8
+    amount = np.asarray(amount, dtype=float)[..., np.newaxis, np.newaxis]
+    segment_normals = _get_norm_segment_vectors(data)
+
+    offset = np.empty(data.shape)
+    offset[..., 0, :] = data[..., 0, :] + segment_normals[..., 0, :] * amount[..., 0, :]
+    offset[..., -1, :] = data[..., -1, :] + segment_normals[..., -1, :] * amount[..., 0, :]
+    second = offset.copy()
+    second_mask = np.zeros(data.shape[:-1], dtype=bool)
+
+    # corners
+    points = data[..., 1:-1, :]
+    segments = np.diff(data, axis=-2)
+    d1 = segments[..., :-1, :]
+    d2 = segments[..., 1:, :]
+    n1 = segment_normals[..., :-1, :]
+    n2 = segment_normals[..., 1:, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        length_1 = np.linalg.norm(d1, axis=-1)
+        length_2 = np.linalg.norm(d2, axis=-1)
+        cosphi = np.sum(d1 * d2, axis=-1) / (length_1 * length_2)
+
+        # almost straight or very short segments
+        straight = (cosphi > 0.9999) | (length_1 < coresize) | (length_2 < coresize)
+        # the direction changes by 180 degree
+        reverse = ~straight & (cosphi < -0.9999)
+
+        sign = np.where(np.sum(d2 * n1, axis=-1) > 0, 1., -1.)
+        phi = np.arccos(np.sum(n1 * n2, axis=-1))
+        ext_vec = n1 - (sign * np.tan(phi / 2) / length_1)[..., np.newaxis] * d1
+
+    # point normals (approximated by the neighbours) are only needed for the straight corners,
+    # at 180 degree turns the neighbours coincide
+    normvectors = np.zeros(points.shape)
+    normvectors[straight] = _rotate_rhs(_normalize_rows(d1[straight] + d2[straight]))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corners = np.where(straight[..., np.newaxis],
+                           points + normvectors * amount / cosphi[..., np.newaxis],
+                           points + np.where(reverse[..., np.newaxis], n1, ext_vec) * amount)
+
+    offset[..., 1:-1, :] = corners
+    second[..., 1:-1, :] = points + n2 * amount
+    second_mask[..., 1:-1] = reverse
+
+    return offset, second, second_mask
+
+
 class PolyLine2D(PolyLine):
     def __add__(self, other):  # this is python default behaviour for lists
         if other.__class__ is self.__class__:
@@ -225,48 +387,75 @@ class PolyLine2D(PolyLine):
         """
         # TODO: we have some float issues, check if we were slightly above 1 before and are slightly
         # below 0 now -> on the point
-        startpoint = int(startpoint)
-        for i in rangefrom(len(self)-1, startpoint):
-            try:
-                # (x,y), i, k
-                pos, ik1, ik2 = cut(self[i], self[i+1], p1, p2)
-                good_cut = 0 <= ik1 < 1 or (ik1 == 1 and i == len(self)-1)
-                extrapolated_front = i == 0 and ik1 <= 0
-                extrapolated_back = i == len(self)-2 and ik1 > 0
-                extrapolated_cut = extrapolated_front or extrapolated_back
-
-                if good_cut or extrapolate and extrapolated_cut:
-                    if cut_only_positive and ik2 < 0:
-                        continue
-                    yield i+ik1, ik2
-            except np.linalg.LinAlgError:
-                continue
+        if len(self) < 2:
+            return
+
+        ik1, ik2 = cut_array(self.data[:-1], self.data[1:], p1, p2)
+        mask = self._get_cut_mask(ik1, extrapolate)
+        if cut_only_positive:
+            mask &= ik2 >= 0
+
+        for i in rangefrom_array(len(self)-1, int(startpoint)):
+            if mask[i]:
+                yield i+ik1[i], ik2[i]
+
+    @staticmethod
+    def _get_cut_mask(ik1, extrapolate=False):
+        """
+        Select the segment-cuts within the segments (and the extrapolated ones at both ends)
+        """
+        with np.errstate(invalid="ignore"):
+            mask = (0 <= ik1) & (ik1 < 1)
+            if extrapolate:
+                mask[0] |= ik1[0] <= 0
+                mask[-1] |= ik1[-1] > 0
+
+        return mask
 
     def cut_with_polyline(self, pl, startpoint=0):
-        for i, (p1, p2) in enumerate(zip(pl[:-1], pl[1:])):
-            l = norm(p2-p1)
-            for ik1, k2 in self.cut(p1, p2, startpoint, cut_only_positive=True):
-                ik2 = i + (norm(self[ik1] - p1) / l)
-                yield ik1, ik2
+        """
+        Iterate over all cuts with the segments of another polyline (extending beyond the segments end)
+
+        yield ik (self), ik (pl)
+        """
+        other = np.asarray(pl.data if isinstance(pl, PolyLine) else pl, dtype=float)
+        if len(self) < 2 or len(other) < 2:
+            return
+
+        # rows: segments of pl, columns: segments of self
+        ik1, ik2 = cut_array(self.data[:-1], self.data[1:], other[:-1, np.newaxis], other[1:, np.newaxis])
+        order = rangefrom_array(len(self)-1, int(startpoint))
+
+        for i in range(len(other)-1):
+            mask = self._get_cut_mask(ik1[i])
+            with np.errstate(invalid="ignore"):
+                mask &= ik2[i] >= 0
+            for j in order[mask[order]]:
+                yield j + ik1[i, j], i + ik2[i, j]
 
     def check(self):  # TODO: IMPROVE (len = len(self.data), len-=,...)
         """
         Check for mistakes in the array, such as for the moment: self-cuttings,..
         """
         super(PolyLine2D, self).check()
-        for i in range(len(self.data) - 3):
-            if i > len(self.data) - 4:
-                break
-            for j in range(i + 2, len(self.data) - 2):
-                if j > len(self.data) - 3:
+        i = 0
+        while i < len(self.data) - 3:
+            # find all cuts of segment i with the following (non-adjacent) segments,
+            # remove the loop up to the first one and continue searching behind it
+            j_start = i + 2
+            while j_start < len(self.data) - 2:
+                data = self.data
+                k, l = cut_array(data[i], data[i+1], data[j_start:-2], data[j_start+1:-1])
+                with np.errstate(invalid="ignore"):
+                    cuts = np.flatnonzero((0 < k) & (k < 1.) & (0 < l) & (l < 1.))
+                if not len(cuts):
                     break
-                try:
-                    temp = cut(self.data[i], self.data[i + 1], self.data[j], self.data[j + 1])
-                    if 0 < temp[1] < 1. and 0 < temp[2] < 1.:
-                        #self.data = self.data[:i] + [temp[0]] + self.data[j + 1:]
-                        self.data = np.concatenate([self.data[:i], [temp[0]], self.data[j+1:]])
-                except np.linalg.linalg.LinAlgError:
-                    continue
+
+                j = j_start + cuts[0]
+                cut_point = data[i] + k[cuts[0]] * (data[i+1] - data[i])
+                self.data = np.concatenate([data[:i], [cut_point], data[j+1:]])
+                j_start = j + 1
+            i += 1
 
         return self
 
@@ -277,22 +466,12 @@ class PolyLine2D(PolyLine):
         this property returns a normal for every point,
         approximated by the 2 neighbour points (len(data) == len(normals))
         """
-        rotate = lambda x: normalize(x).dot([[0, -1], [1, 0]])
-        normvectors = [rotate(self.data[1] - self.data[0])]
-        for j in range(1, len(self.data) - 1):
-            normvectors.append(
-                #rotate(normalize(self.data[j + 1] - self.data[j]) + normalize(self.data[j] - self.data[j - 1])))
-                rotate(self.data[j + 1] - self.data[j - 1]))
-        normvectors.append(rotate(self.data[-1] - self.data[-2]))
-        return normvectors
-
+        return _get_normvectors(self.data)
 
     @cached_property('self')
     def tangents(self):
-        tangents = []
-        for p1, p2 in self.segments:
-            tangents.append((p2 - p1) / norm(p2 - p1))
-        return np.array(tangents)
+        segments = self.get_segments()
+        return segments / np.linalg.norm(segments, axis=1)[:, np.newaxis]
 
     @cached_property('self')
     def norm_segment_vectors(self):
@@ -300,11 +479,7 @@ class PolyLine2D(PolyLine):
         return all the normals based on the segments of the data:
         len(data) - 1 == len(normals)
         """
-        rotate = lambda x: normalize(x).dot([[0, -1], [1, 0]])
-        normvectors = []
-        for p1, p2 in self.segments:
-            normvectors.append(rotate(normalize(p2 - p1)))
-        return np.array(normvectors)
+        return _get_norm_segment_vectors(self.data)
 
     def get_normal(self, ik):
         """get normal-vector by ik-value"""
@@ -320,11 +495,12 @@ class PolyLine2D(PolyLine):
 
     @property
     def segments(self):
-        data = self.data
-        segments = []
-        for i in range(len(self) - 1):
-            segments.append(data[i:i+2])
-        return np.array(segments)
+        """
+        array of [start, end] for every segment
+        """
+        if len(self) < 2:
+            return np.array([])
+        return np.stack([self.data[:-1], self.data[1:]], axis=1)
 
     def move(self, vector):
         """
@@ -332,7 +508,7 @@ class PolyLine2D(PolyLine):
         """
         assert len(vector) == 2
         #print(vector)
-        self.data += vector[:]
+        self.data = self.data + vector[:]
 
         return self
 
@@ -340,41 +516,35 @@ class PolyLine2D(PolyLine):
         """
         Shift the whole line for a given amount (->Sewing allowance)
         """
-        # cos(vectorangle(a,b)) = (a1 b1+a2 b2)/Sqrt[(a1^2+a2^2) (b1^2+b2^2)]
-        newlist = []
-        second = self.data[0]
-        third = self.data[1]
-        newlist.append(second + self.norm_segment_vectors[0] * amount)
-        for i in range(1, len(self.data) - 1):
-            first = second
-            second = third
-            third = self.data[i + 1]
-            d1 = second - first
-            d2 = third - second
-            cosphi = d1.dot(d2) / np.sqrt(d1.dot(d1) * d2.dot(d2))
-            coresize = 1e-8
-            if cosphi > 0.9999 or norm(d1) < coresize or norm(d2) < coresize:
-                newlist.append(second + self.normvectors[i] * amount / cosphi)
-            elif cosphi < -0.9999: # this is true if the direction changes 180 degree
-                n1 = self.norm_segment_vectors[i-1]
-                n2 = self.norm_segment_vectors[i]
-                newlist.append(second + self.norm_segment_vectors[i-1] * amount)
-                newlist.append(second + self.norm_segment_vectors[i] * amount)
-            else:
-                n1 = self.norm_segment_vectors[i-1]
-                n2 = self.norm_segment_vectors[i]
-                sign = -1. + 2. * (d2.dot(n1) > 0)
-                phi = np.arccos(n1.dot(n2))
-                d1 = normalize(d1)
-                ext_vec = n1 - sign * d1 * np.tan(phi / 2)
-                newlist.append(second + ext_vec * amount)
-
-                # newlist.append(cut(a, b, c, d)[0])
-        newlist.append(third + self.norm_segment_vectors[-1] * amount)
-        self.data = newlist
+        offset, second, second_mask = _get_offset(self.data, amount)
+        self.data = np.insert(offset, np.flatnonzero(second_mask) + 1, second[second_mask], axis=0)
 
         return self
 
+    @classmethod
+    def add_stuff_multiple(cls, lines, amounts):
+        """
+        Shift multiple lines (in place) at once, lines of the same length are calculated together
+        :param lines: list of PolyLine2D
+        :param amounts: amount for every line or a single value for all
+        :return: lines
+        """
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=float), (len(lines),))
+
+        groups = {}
+        for index, line in enumerate(lines):
+            groups.setdefault(len(line), []).append(index)
+
+        for indices in groups.values():
+            data = np.array([lines[index].data for index in indices])
+            offset, second, second_mask = _get_offset(data, amounts[indices])
+
+            for i, index in enumerate(indices):
+                mask = second_mask[i]
+                lines[index].data = np.insert(offset[i], np.flatnonzero(mask) + 1, second[i][mask], axis=0)
+
+        return lines
+
     def mirror(self, p1, p2):
         """
         Mirror against a line through p1 and p2
@@ -382,7 +552,7 @@ class PolyLine2D(PolyLine):
         p1 = np.array(p1)
         p2 = np.array(p2)
         normvector = normalize(np.array(p1-p2).dot([[0, -1], [1, 0]]))
-        self.data = [point - 2*normvector.dot(point-p1)*normvector for point in self.data]
+        self.data = self.data - 2 * np.outer((self.data - p1).dot(normvector), normvector)
 
         return self
 
@@ -393,13 +563,11 @@ class PolyLine2D(PolyLine):
         if not radians:
             angle = np.pi*angle/180
         rotation_matrix = rotation_2d(angle)
-        new_data = []
-        for point in self.data:
-            if startpoint is not None:
-                new_data.append(startpoint + rotation_matrix.dot(point - startpoint))
-            else:
-                new_data.append(rotation_matrix.dot(point))
-        self.data = new_data
+        if startpoint is not None:
+            startpoint = np.asarray(startpoint)
+            self.data = startpoint + (self.data - startpoint).dot(rotation_matrix.T)
+        else:
+            self.data = self.data.dot(rotation_matrix.T)
 
         return self
 
@@ -407,8 +575,8 @@ class PolyLine2D(PolyLine):
         if not self:
             return [[0,0], [0,0]]
         return [
-            [min([p[0] for p in self]), min([p[1] for p in self])],
-            [max([p[0] for p in self]), max([p[1] for p in self])],
+            self.data.min(axis=0).tolist(),
+            self.data.max(axis=0).tolist()
         ]
 
     def _repr_svg_(self):
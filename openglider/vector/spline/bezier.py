@@ -21,25 +21,66 @@ from __future__ import division
 
 import numpy as np
 
-from openglider.utils.cache import HashedList
+from openglider.utils.cache import HashedList, BoundedCache
 from openglider.vector import norm, Interpolation
 from openglider.vector.transformation import Reflection
 from openglider.utils import dualmethod
 
 
-class _BernsteinFactory():
+# basis matrices for equidistant parameters, shared by all splines of the process
+basis_matrices = BoundedCache("spline basis matrix", maxsize=256)
+
+
+class BasisFactory(object):
+    """
+    Base for the basis functions of a spline.
+    get_basis_matrix evaluates all basis functions for an array of parameters at once.
+    """
+    degree = None
+
     def __init__(self):
         self.bases = {}
 
-    def __call__(self, degree):
-        """degree is the number of controlpoints"""
-        if degree not in self.bases:
-            def bsf(n):
-                return lambda x: choose(degree - 1, n) * (x ** n) * ((1 - x) ** (degree - 1 - n))
+    def __call__(self, numpoints):
+        """
+        List of the basis functions (callables) for a number of controlpoints
+        """
+        if numpoints not in self.bases:
+            def basis_function(index):
+                return lambda t: self.get_basis_matrix(numpoints, [t])[0, index]
+
+            self.bases[numpoints] = [basis_function(i) for i in range(numpoints)]
 
-            self.bases[degree] = [bsf(i) for i in range(degree)]
+        return self.bases[numpoints]
 
-        return self.bases[degree]
+    def get_basis_matrix(self, numpoints, values):
+        """
+        :return: matrix (len(values) x numpoints) of the basis functions
+        """
+        raise NotImplementedError()
+
+    def get_matrix(self, numpoints, num):
+        """
+        Cached (read-only) basis matrix for num equidistant parameters in [0, 1]
+        """
+        key = (type(self), self.degree, numpoints, num)
+        return basis_matrices.get(key, self._get_matrix, numpoints, num)
+
+    def _get_matrix(self, numpoints, num):
+        matrix = self.get_basis_matrix(numpoints, np.linspace(0, 1, num))
+        matrix.flags.writeable = False
+        return matrix
+
+
+class _BernsteinFactory(BasisFactory):
+    def get_basis_matrix(self, numpoints, values):
+        """numpoints is the number of controlpoints (degree + 1)"""
+        t = np.asarray(values, dtype=float)[:, np.newaxis]
+        degree = numpoints - 1
+        exponents = np.arange(numpoints)
+        coefficients = np.array([choose(degree, n) for n in exponents], dtype=float)
+
+        return coefficients * (t ** exponents) * ((1 - t) ** (degree - exponents))
 
     def __json__(self):
         return {}
@@ -91,14 +132,17 @@ class Bezier(HashedList):
         return spline
 
     def __call__(self, value):
-        dim = len(self.data[0])
-        assert 0 <= value <= 1, "value must be in the range (0,1), not {}".format(value)
+        """
+        Point for a parameter value or an array of points for an array of values
+        """
+        values = np.asarray(value, dtype=float)
+        assert np.all((0 <= values) & (values <= 1)), "value must be in the range (0,1), not {}".format(value)
 
-        val = np.zeros(dim)
-        base = self.basefactory(len(self.data))
-        for i, point in enumerate(self.data):
-            val += point * base[i](value)
-        return val
+        matrix = self.basefactory.get_basis_matrix(len(self.data), values.reshape(-1))
+        points = np.dot(matrix, self.data)
+        if values.ndim == 0:
+            return points[0]
+        return points
 
     @property
     def numpoints(self):
@@ -110,11 +154,11 @@ class Bezier(HashedList):
     @numpoints.setter
     def numpoints(self, num_ctrl, num_points=50):
         if not num_ctrl == self.numpoints:
-            data = [self(i) for i in np.linspace(0, 1, num_points)]
+            data = self(np.linspace(0, 1, num_points))
             self.fit(data, num_ctrl)
 
     def change_base(self, base, num_points=50):
-        data = [self(i) for i in np.linspace(0, 1, num_points)]
+        data = self(np.linspace(0, 1, num_points))
         self.basefactory = base
         self._matrix = None
         self.fit(data, self.numpoints)
@@ -133,11 +177,7 @@ class Bezier(HashedList):
         Fit to a given set of points with a certain number of spline-points (default=3)
         if start (/ end) is True, the first (/ last) point of the Curve is included
         """
-        base = self.basefactory(numpoints)
-        matrix = np.matrix(
-            [[base[column](row * 1. / (len(points) - 1))
-                for column in range(len(base))]
-                    for row in range(len(points))])
+        matrix = np.matrix(self.basefactory.get_matrix(numpoints, len(points)))
 
         if not start and not end:
             matrix = np.linalg.pinv(matrix)
@@ -194,11 +234,7 @@ class Bezier(HashedList):
         num_ctrl_pts = len(constraint)
 
         # create the base matrix:
-        base = self.basefactory(num_ctrl_pts)
-        matrix = np.array(
-            [[base[column](row * 1. / (len(points) - 1))
-                for column in range(len(base))]
-                    for row in range(len(points))])
+        matrix = self.basefactory.get_matrix(num_ctrl_pts, len(points))
 
         # create the b vector for each dim
         b = np.array(list(zip(*points)))
@@ -252,16 +288,8 @@ class Bezier(HashedList):
         self.controlpoints = [p*[x,y] for p in self.controlpoints]
 
     def get_matrix(self, num=50):
-        num_points = len(self._data)
-        if self._matrix is not None and self._matrix.shape == (num, num_points):
-            return self._matrix
-        else:
-            self._matrix = np.ndarray([num, num_points])
-            functions = self.basefactory(num_points)
-            for row, value in enumerate(np.linspace(0, 1 , num)):
-                for col, foo in enumerate(functions):
-                    self._matrix[row, col] = foo(value)
-            return self._matrix
+        self._matrix = self.basefactory.get_matrix(len(self._data), num)
+        return self._matrix
 
     def get_sequence(self, num=None):
         if num is None:
@@ -309,8 +337,8 @@ class SymmetricBezier(Bezier):
     @numpoints.setter
     def numpoints(self, num_ctrl, num_points=50):
         if not num_ctrl == self.numpoints:
-            data = [self(i) for i in np.linspace(0, 1, num_points)]
-            self.fit(np.array(data), num_ctrl)
+            data = self(np.linspace(0, 1, num_points))
+            self.fit(data, num_ctrl)
 
     @dualmethod
     def fit(cls, data, numpoints=3, start=True, end=True):
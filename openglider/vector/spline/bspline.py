@@ -1,18 +1,11 @@
-from openglider.vector.spline.bezier import Bezier, SymmetricBezier
-from openglider.utils import dualmethod
+import numpy as np
 
-class BSplineBase():
+from openglider.vector.spline.bezier import Bezier, SymmetricBezier, BasisFactory
+
+class BSplineBase(BasisFactory):
     def __init__(self, degree=3):
+        super(BSplineBase, self).__init__()
         self.degree = degree
-        self.bases = {}
-
-    def __call__(self, numpoints):      # number of controlpoints
-        if numpoints not in self.bases and True:
-            knots = self.make_knot_vector(self.degree, numpoints)
-            basis = [self.get_basis(self.degree, i, knots) for i in range(numpoints)]
-            self.bases[numpoints] = basis
-
-        return self.bases[numpoints]
 
     def __json__(self):
         return {"degree": self.degree}
@@ -22,41 +15,36 @@ class BSplineBase():
         degree = degree or 3
         return cls(degree)
 
-    def get_basis(self, degree, i, knots):
-        """ Returns a basis_function for the given degree """
-        if degree == 0:
-            def basis_function(t):
-                """The basis function for degree = 0 as per eq. 7"""
-                t_this = knots[i]
-                t_next = knots[i+1]
-                return t_next >= t > t_this
-        else:
-
-            def basis_function(t):
-                """The basis function for degree > 0 as per eq. 8"""
-                if i == t == 0:
-                    return 1
-                out = 0.
-                t_this = knots[i]
-                t_next = knots[i+1]
-                t_precog  = knots[i+degree]
-                t_horizon = knots[i+degree+1]
-
-                top = (t-t_this)
-                bottom = (t_precog-t_this)
-
-                if bottom != 0:
-                    out = top/bottom * self.get_basis(degree-1, i, knots)(t)
-
-                top = (t_horizon-t)
-                bottom = (t_horizon-t_next)
-                if bottom != 0:
-                    out += top/bottom * self.get_basis(degree-1, i+1, knots)(t)
-                return out
-
-        return basis_function
+    def get_basis_matrix(self, numpoints, values):
+        """
+        Cox-de Boor recursion for all basis functions and parameters at once
+        """
+        knots = np.array(self.make_knot_vector(self.degree, numpoints))
+        t = np.asarray(values, dtype=float)[:, np.newaxis]
+
+        # degree 0: 1 for t_i < t <= t_i+1
+        basis = ((knots[:-1] < t) & (t <= knots[1:])).astype(float)
+
+        for degree in range(1, self.degree + 1):
+            count = len(knots) - degree - 1
+            t_this = knots[:count]
+            t_next = knots[1:count+1]
+            t_precog = knots[degree:degree+count]
+            t_horizon = knots[degree+1:degree+1+count]
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rising = np.where(t_precog != t_this, (t - t_this) / (t_precog - t_this), 0.)
+                falling = np.where(t_horizon != t_next, (t_horizon - t) / (t_horizon - t_next), 0.)
+
+            basis = rising * basis[:, :count] + falling * basis[:, 1:count+1]
 
+        if self.degree > 0:
+            # the first basis function is 1 at t=0
+            start = t[:, 0] == 0
+            basis[start] = 0.
+            basis[start, 0] = 1.
 
+        return basis
 
     def make_knot_vector(self, degree, num_points):
         """
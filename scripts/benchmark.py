@@ -0,0 +1,248 @@
+#! /usr/bin/python3
+"""
+End-to-end benchmarks of the glider pipeline, using the demo data in tests/common.
+
+Every stage is timed on its own (the setup is not included) for all combinations
+of the sizes it depends on:
+
+    cells:          shape.cell_num of the parametric glider (full span)
+    profile_points: num_profile for get_glider_3d (default: the profiles of the glider)
+    midribs:        number of midribs for the mesh
+
+usage:
+    python scripts/benchmark.py -o baseline.json
+    python scripts/benchmark.py --stages get_mesh unwrap --cells 24 48 --midribs 0 3
+    python scripts/benchmark.py --compare baseline.json   # exit code 1 on regressions
+"""
+import argparse
+import collections
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import openglider
+from openglider import jsonify
+from openglider.glider import ParametricGlider
+from openglider.plots import PlotMaker
+
+DEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "common")
+DEMOKITE_JSON = os.path.join(DEMO_DIR, "demokite.json")
+
+# name -> (setup, parameter names)
+# setup(**parameters) prepares everything and returns the function to be timed
+STAGES = collections.OrderedDict()
+
+
+def stage(*parameters):
+    def register(setup):
+        STAGES[setup.__name__] = (setup, parameters)
+        return setup
+    return register
+
+
+def load_glider_2d(cells=None):
+    glider_2d = openglider.load(DEMOKITE_JSON)
+    if cells is not None:
+        glider_2d.shape.cell_num = cells
+    return glider_2d
+
+
+def load_glider_3d(cells=None, profile_points=None):
+    return load_glider_2d(cells).get_glider_3d(num_profile=profile_points)
+
+
+def load_layout(cells=None, profile_points=None):
+    plots = PlotMaker(load_glider_3d(cells, profile_points))
+    plots.unwrap()
+    return plots.get_all_grouped()
+
+
+def get_tempfile(name):
+    return os.path.join(tempfile.gettempdir(), "openglider_benchmark_" + name)
+
+
+@stage("cells")
+def import_ods_2d(cells):
+    # tests/common/demokite.ods is outdated, export the demo glider first
+    path = get_tempfile("glider.ods")
+    load_glider_2d(cells).export_ods(path)
+    return lambda: ParametricGlider.import_ods(path)
+
+
+@stage("cells", "profile_points")
+def get_glider_3d(cells, profile_points):
+    glider_2d = load_glider_2d(cells)
+    return lambda: glider_2d.get_glider_3d(num_profile=profile_points)
+
+
+@stage("cells", "profile_points")
+def lineset_recalc(cells, profile_points):
+    glider = load_glider_3d(cells, profile_points)
+    return glider.lineset.recalc
+
+
+@stage("cells", "profile_points", "midribs")
+def get_mesh(cells, profile_points, midribs):
+    glider = load_glider_3d(cells, profile_points)
+    return lambda: glider.get_mesh(midribs)
+
+
+@stage("cells", "profile_points")
+def unwrap(cells, profile_points):
+    plots = PlotMaker(load_glider_3d(cells, profile_points))
+    return plots.unwrap
+
+
+@stage("cells", "profile_points")
+def export_svg(cells, profile_points):
+    layout = load_layout(cells, profile_points)
+    return lambda: layout.export_svg(get_tempfile("layout.svg"))
+
+
+@stage("cells", "profile_points")
+def export_dxf(cells, profile_points):
+    layout = load_layout(cells, profile_points)
+    return lambda: layout.export_dxf(get_tempfile("layout.dxf"))
+
+
+@stage("cells")
+def json_roundtrip_2d(cells):
+    glider_2d = load_glider_2d(cells)
+    return lambda: jsonify.loads(jsonify.dumps(glider_2d))
+
+
+@stage("cells", "profile_points")
+def json_roundtrip_3d(cells, profile_points):
+    glider = load_glider_3d(cells, profile_points)
+    return lambda: jsonify.loads(jsonify.dumps(glider))
+
+
+def run_stage(name, parameters, repeat=3):
+    setup, _ = STAGES[name]
+    times = []
+    for _ in range(repeat):
+        function = setup(**parameters)  # fresh objects, no cached results from the last run
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "stage": name,
+        "parameters": parameters,
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times)
+    }
+
+
+def run(stages=None, sizes=None, repeat=3, log=print):
+    """
+    :param stages: names of the stages to run (default: all)
+    :param sizes: {parameter: [values]}
+    :return: list of results
+    """
+    sizes = sizes or {}
+    results = []
+    for name in stages or STAGES:
+        _, parameter_names = STAGES[name]
+        values = [sizes.get(parameter, [None]) for parameter in parameter_names]
+        for combination in itertools.product(*values):
+            parameters = dict(zip(parameter_names, combination))
+            result = run_stage(name, parameters, repeat)
+            log("{:<20} {:<50} {:>8.3f}s".format(name, json.dumps(parameters), result["median"]))
+            results.append(result)
+
+    return results
+
+
+def get_metadata():
+    return {
+        "date": datetime.datetime.now().isoformat(),
+        "openglider": openglider.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor()
+    }
+
+
+def compare(results, baseline, tolerance=0.2, min_difference=0.01):
+    """
+    Compare the median times with a baseline.
+    A stage regressed if it is slower by more than tolerance (relative) and min_difference (seconds)
+
+    :return: list of (result, baseline_result, ratio, regressed)
+    """
+    def key(result):
+        return result["stage"], json.dumps(result["parameters"], sort_keys=True)
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    comparison = []
+    for result in results:
+        old = baseline_results.get(key(result))
+        if old is None:
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        regressed = (ratio > 1 + tolerance and
+                     result["median"] - old["median"] > min_difference)
+        comparison.append((result, old, ratio, regressed))
+
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the openglider pipeline")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="stages to run (default: all)")
+    parser.add_argument("--cells", nargs="+", type=int, help="cell numbers (full span)")
+    parser.add_argument("--profile-points", nargs="+", type=int, help="number of profile points")
+    parser.add_argument("--midribs", nargs="+", type=int, default=[0, 3], help="number of midribs for the mesh")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="write the results to a json file")
+    parser.add_argument("--compare", help="baseline json file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    sizes = {}
+    if args.cells:
+        sizes["cells"] = args.cells
+    if args.profile_points:
+        sizes["profile_points"] = args.profile_points
+    if args.midribs:
+        sizes["midribs"] = args.midribs
+
+    results = run(args.stages, sizes, args.repeat)
+    data = {"metadata": get_metadata(), "results": results}
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(data, outfile, indent=2)
+
+    if args.compare:
+        with open(args.compare) as infile:
+            baseline = json.load(infile)
+
+        regressions = 0
+        print("\ncomparison with {} ({}):".format(args.compare, baseline["metadata"]["date"]))
+        for result, old, ratio, regressed in compare(results, baseline, args.tolerance):
+            regressions += regressed
+            print("{:<20} {:<50} {:>8.3f}s {:>8.3f}s {:>6.2f}x {}".format(
+                result["stage"], json.dumps(result["parameters"]),
+                old["median"], result["median"], ratio, "REGRESSION" if regressed else ""))
+
+        if regressions:
+            print("{} regression(s)".format(regressions))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,8 @@
 import unittest
 import random
 
+import numpy as np
+
 from common import openglider
 from openglider.glider import ballooning
 
@@ -43,6 +45,12 @@ class TestBallooningBezier(unittest.TestCase):
             val = random.random()
             self.assertAlmostEqual(temp[val], self.ballooning[val] * factor)
 
+    def test_multiplication_classic(self):
+        classic = ballooning.Ballooning(self.ballooning.upper.copy(), self.ballooning.lower.copy())
+        doubled = classic * 2
+        for x in np.linspace(-1, 1, 21):
+            self.assertAlmostEqual(doubled[x], classic[x] * 2)
+
     def test_addition(self):
         num = 100
         x_values = [(i-num)/num for i in range(2*num+1)]
@@ -52,6 +60,45 @@ class TestBallooningBezier(unittest.TestCase):
         for x in x_values:
             self.assertAlmostEqual(b1[x]+b2[x], mixed[x], places=2)
 
+    def test_values(self):
+        x_values = np.linspace(-1, 1, 101)
+        values = self.ballooning[x_values]
+        upper = self.ballooning.upper.data
+        lower = self.ballooning.lower.data
+        expected = np.where(x_values < 0,
+                            np.interp(-x_values, upper[:, 0], upper[:, 1]),
+                            np.interp(x_values, lower[:, 0], lower[:, 1]))
+        np.testing.assert_almost_equal(values, expected)
+        for x, value in zip(x_values, values):
+            self.assertAlmostEqual(self.ballooning[x], value)
+
+        # sin(phi)/phi = l/b
+        inflated = values > 0
+        phi = ballooning.Ballooning.arcsinc(1. / (values[inflated] + 1))
+        np.testing.assert_almost_equal(np.sinc(phi / np.pi), 1. / (values[inflated] + 1))
+        for value in values[inflated]:
+            self.assertAlmostEqual(np.sinc(ballooning.Ballooning.arcsinc(1. / (value + 1)) / np.pi), 1. / (value + 1))
+
+        self.assertRaises(ValueError, self.ballooning.get_values, [0, 1.1])
+
+    def test_phi(self):
+        x_values = np.linspace(-1, 1, 101)
+        phi = self.ballooning.phi_array(x_values)
+        values = self.ballooning.get_values(x_values)
+        np.testing.assert_array_equal(phi[values <= 0], 0)
+        # b/l = phi/sin(phi)
+        inflated = values > 0
+        np.testing.assert_almost_equal(phi[inflated] / np.sin(phi[inflated]), 1 + values[inflated], 10)
+
+    def test_arcsinc(self):
+        phi = np.linspace(0, np.pi, 1001)[1:-1]
+        np.testing.assert_allclose(ballooning.Ballooning.arcsinc(np.sinc(phi / np.pi)), phi, atol=1e-9)
+        self.assertEqual(ballooning.Ballooning.arcsinc(1.), 0)
+        self.assertAlmostEqual(ballooning.Ballooning.arcsinc(0.), np.pi)
+        self.assertAlmostEqual(ballooning.Ballooning.arcsinc(2 / np.pi), np.pi / 2)
+        self.assertTrue(np.isnan(ballooning.Ballooning.arcsinc(np.nan)))
+        np.testing.assert_array_equal(np.isnan(ballooning.Ballooning.arcsinc([0.5, np.nan, 1.])), [False, True, False])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -22,7 +22,10 @@ from __future__ import division
 import unittest
 import random
 
-from openglider.vector.spline import Bezier
+import numpy as np
+
+from openglider.vector.spline import Bezier, BSpline, BSplineBase
+from openglider.vector.spline.bezier import basis_matrices
 
 
 class TestBezier(unittest.TestCase):
@@ -51,6 +54,28 @@ class TestBezier(unittest.TestCase):
         sequence = self.bezier.get_sequence(100)
         # print(sequence)
 
+    def test_basis_matrix(self):
+        values = np.linspace(0, 1, 20)
+        for spline in (self.bezier, BSpline(self.bezier.controlpoints), BSpline(self.bezier.controlpoints[:4])):
+            matrix = spline.get_matrix(20)
+            self.assertIs(matrix, spline.get_matrix(20))
+            self.assertFalse(matrix.flags.writeable)
+            # partition of unity
+            np.testing.assert_almost_equal(matrix.sum(axis=1), np.ones(20))
+            points = spline(values)
+            np.testing.assert_almost_equal(points, spline.get_sequence(20))
+            for value, point in zip(values, points):
+                np.testing.assert_almost_equal(spline(value), point)
+
+        # degree 1: piecewise linear between the controlpoints
+        base = BSplineBase(1)
+        np.testing.assert_almost_equal(base.get_basis_matrix(3, [0, 0.25, 1]),
+                                       [[1, 0, 0], [0.5, 0.5, 0], [0, 0, 1]])
+
+        for num in range(basis_matrices.maxsize + 10):
+            self.bezier.get_matrix(num + 2)
+        self.assertEqual(len(basis_matrices.cache), basis_matrices.maxsize)
+
 
 
 if __name__ == '__main__':
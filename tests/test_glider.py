@@ -20,8 +20,11 @@
 import random
 import unittest
 
+import numpy as np
+
 from common import *
 import openglider.glider
+from openglider.utils import instrumentation
 
 
 class GliderTestClass(TestCase):
@@ -71,6 +74,87 @@ class TestGlider(GliderTestClass):
         for cell in self.glider.cells:
             cell.mean_rib(10)
 
+    def test_midribs_array(self):
+        y_values = [0, random.random(), 0.5, 1]
+        for cell in self.glider.cells:
+            midribs = cell.get_midribs_array(y_values)
+            self.assertEqual(midribs.shape, (len(y_values), len(cell.prof1), 3))
+            for y, midrib in zip(y_values, midribs):
+                self.assertAlmostEqual(abs(midrib - cell.midrib(y).data).max(), 0)
+
+    def test_return_ribs(self):
+        ribs = self.glider.return_ribs(3)
+        self.assertEqual(len(ribs), len(self.glider.cells) * 4 + 1)
+        self.assertAlmostEqual(abs(ribs[-1] - self.glider.ribs[-1].profile_3d.data).max(), 0)
+
+    def test_flattened_cell(self):
+        for cell in self.glider.cells:
+            flat = cell.get_flattened_cell(20)
+            left, right = [line.data for line in flat["ballooned"]]
+            midribs = np.array([rib.data for rib in flat["midribs"]])
+
+            rib_lengths = np.linalg.norm(np.diff(midribs, axis=0), axis=2).sum(axis=0)
+            np.testing.assert_almost_equal(np.linalg.norm(right - left, axis=1), rib_lengths)
+            np.testing.assert_almost_equal(np.linalg.norm(np.diff(left, axis=0), axis=1),
+                                           np.linalg.norm(np.diff(midribs[0], axis=0), axis=1))
+            np.testing.assert_almost_equal(flat["inner"][0].data, left)
+            np.testing.assert_almost_equal(flat["inner"][-1].data, right)
+
+    def test_flattened_cell_cache(self):
+        cell = self.glider.cells[1]
+        flat = cell.get_flattened_cell(10)
+        self.assertIs(flat, cell.get_flattened_cell(10))
+        self.assertIs(flat, cell.get_flattened_cell(numribs=10))
+        self.assertIs(cell.get_flattened_cell(), cell.get_flattened_cell(50))
+        self.assertEqual(len(flat["inner"]), 12)
+        self.assertEqual(len(flat["midribs"]), 10)
+        self.assertIsNot(flat, cell.get_flattened_cell(11))
+
+        cell.rib2.chord *= 1.1
+        self.assertIsNot(flat, cell.get_flattened_cell(10))
+
+    def test_copy_shared_data(self):
+        profile = self.glider.ribs[0].profile_2d
+        point = profile[3].copy()
+
+        glider = self.glider.copy()
+        profile_copy = glider.ribs[0].profile_2d
+        self.assertIsNot(profile_copy, profile)
+        self.assertIs(profile_copy.data, profile.data)
+
+        # copy on write
+        profile_copy[3] = point + [0, 0.01]
+        self.assertIsNot(profile_copy.data, profile.data)
+        np.testing.assert_array_equal(profile[3], point)
+        profile[3] = point + [0, 0.02]
+        self.assertAlmostEqual(profile_copy[3][1], point[1] + 0.01)
+
+        complete = self.glider.copy_complete()
+        self.assertEqual(len(complete.cells), 2 * len(self.glider.cells))
+        self.assertIs(complete.ribs[0].profile_2d.data, complete.ribs[-1].profile_2d.data)
+
+    def test_instrumentation(self):
+        cell = self.glider.cells[0]
+        with instrumentation.record() as recorder:
+            with instrumentation.stage("midribs"):
+                for y in (0, 0.5, 1):
+                    cell.midrib(y)
+            self.glider.lineset.recalc()
+        cell.midrib(0.2)
+
+        report = {entry["name"]: entry for entry in recorder.get_report()}
+        midrib = report["openglider.glider.cell.cell.Cell.midrib"]
+        self.assertEqual(midrib["count"], 3)
+        self.assertLessEqual(midrib["total"], report["midribs"]["total"])
+        self.assertAlmostEqual(report["midribs"]["self"], report["midribs"]["total"] - midrib["total"])
+        self.assertIn("openglider.lines.lineset.LineSet._calc_sag", report)
+        self.assertIn("openglider.lines.lineset.LineSet.recalc", instrumentation.registry)
+
+        events = recorder.get_chrome_trace()["traceEvents"]
+        self.assertEqual(len(events), sum(entry["count"] for entry in report.values()))
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+        self.assertIsNone(instrumentation.get_recorder())
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
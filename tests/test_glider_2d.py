@@ -1,10 +1,15 @@
 import unittest
+from unittest import mock
 
 import tempfile
 import os
+
+import numpy as np
+
 from common import *
 from openglider import jsonify
 from openglider.glider import ParametricGlider
+from openglider.glider.parametric import sweep
 
 TEMPDIR =  tempfile.gettempdir()
 
@@ -20,6 +25,81 @@ class GliderTestCase2D(TestCase):
         glider = self.glider2d.get_glider_3d()
         self.assertAlmostEqual(glider.span, 2*self.glider2d.shape.span, 2)
 
+    def assertUpdatedGlider(self, glider):
+        new_glider = self.glider2d.get_glider_3d()
+        self.assertEqualGlider(glider, new_glider)
+        x_values = np.linspace(-1, 1, 21)
+        for cell_1, cell_2 in zip(glider.cells, new_glider.cells):
+            np.testing.assert_almost_equal(cell_1.ballooning.get_values(x_values),
+                                           cell_2.ballooning.get_values(x_values))
+            self.assertEqual([panel.cut_front for panel in cell_1.panels],
+                             [panel.cut_front for panel in cell_2.panels])
+        # the lineset of an update is iterated from its previous state
+        self.assertAlmostEqual(glider.lineset.total_length, new_glider.lineset.total_length,
+                               delta=1e-3 * new_glider.lineset.total_length)
+
+    def test_update_glider(self):
+        glider = self.glider2d.get_glider_3d()
+        ribs = glider.ribs
+        lineset = glider.lineset
+        positions = {id(node): node.vec.copy() for node in lineset.attachment_points}
+
+        controlpoints = self.glider2d.aoa.controlpoints
+        controlpoints[2][1] += 0.02
+        self.glider2d.aoa.controlpoints = controlpoints
+        self.glider2d.update_glider_3d(glider)
+
+        for rib_1, rib_2 in zip(ribs, glider.ribs):
+            self.assertIs(rib_1, rib_2)
+        # the attachment points are moved, the lineset is kept
+        self.assertIs(glider.lineset, lineset)
+        self.assertFalse(all(np.allclose(positions[id(node)], node.vec) for node in lineset.attachment_points))
+        self.assertUpdatedGlider(glider)
+
+    def test_update_glider_unchanged(self):
+        glider = self.glider2d.get_glider_3d()
+        lineset = glider.lineset
+        balloonings = [cell.ballooning for cell in glider.cells]
+        curves = [self.glider2d.aoa, self.glider2d.zrot, self.glider2d.arc.curve,
+                  self.glider2d.profile_merge_curve, self.glider2d.ballooning_merge_curve]
+        curve_hashes = [hash(curve) for curve in curves]
+
+        with mock.patch.object(self.glider2d, "_get_rib_elements",
+                               wraps=self.glider2d._get_rib_elements) as get_rib_elements:
+            self.glider2d.update_glider_3d(glider)
+            get_rib_elements.assert_not_called()
+
+        self.assertIs(glider.lineset, lineset)
+        self.assertEqual(curve_hashes, [hash(curve) for curve in curves])
+        for ballooning, cell in zip(balloonings, glider.cells):
+            self.assertIs(ballooning, cell.ballooning)
+
+    def test_update_glider_profile(self):
+        glider = self.glider2d.get_glider_3d()
+        profile = self.glider2d.profiles[0]
+        profile.thickness = profile.thickness * 1.2
+        self.glider2d.update_glider_3d(glider)
+        self.assertUpdatedGlider(glider)
+
+    def test_update_glider_ballooning(self):
+        glider = self.glider2d.get_glider_3d()
+        self.glider2d.balloonings[0] *= 1.2
+        self.glider2d.update_glider_3d(glider)
+        self.assertUpdatedGlider(glider)
+
+    def test_update_glider_elements(self):
+        glider = self.glider2d.get_glider_3d()
+        self.glider2d.elements["cuts"][0]["left"] += 0.05
+        self.glider2d.update_glider_3d(glider)
+        self.assertUpdatedGlider(glider)
+
+    def test_update_glider_lineset(self):
+        glider = self.glider2d.get_glider_3d()
+        line = [line for line in self.glider2d.lineset.lines if line.target_length][0]
+        line.target_length *= 1.2
+        self.glider2d.update_glider_3d(glider)
+        self.assertUpdatedGlider(glider)
+
     def test_export(self):
         exp = jsonify.dumps(self.glider2d)
         imp = jsonify.loads(exp)['data']
@@ -32,5 +112,49 @@ class GliderTestCase2D(TestCase):
         self.glider2d.shape.set_area(10)
         self.assertAlmostEqual(self.glider2d.shape.area, 10)
 
+    def test_sweep(self):
+        area = self.glider2d.get_glider_3d().area
+        area_2d = self.glider2d.shape.area
+        variants = list(sweep.grid(area=[area_2d * 0.9, area_2d * 1.1], fail=[False, True]))
+        design_sweep = sweep.Sweep(self.glider2d, metrics=["area", "aspect_ratio", "line_length"],
+                                   setters={"fail": fail_variant})
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "sweep.csv")
+
+            # interrupted sweep
+            rows = list(design_sweep.run(variants[:2], path=path))
+            self.assertEqual([row["index"] for row in rows], [0, 1])
+            self.assertAlmostEqual(rows[0]["metrics"]["area"] / area, 0.9, 3)
+            self.assertEqual(rows[0]["error"], "")
+            self.assertIsNone(rows[1]["metrics"]["area"])
+            self.assertIn("ValueError", rows[1]["error"])
+
+            # killed while writing a row
+            with open(path, "a") as outfile:
+                outfile.write("2,{},Fal".format(variants[2]["area"]))
+
+            # resume
+            self.assertEqual(len(design_sweep.read_checkpoint(path, variants)), 2)
+            table = design_sweep.get_table(variants, processes=2, path=path)
+            self.assertEqual(table.num_rows, len(variants) + 1)
+            self.assertEqual(table[0, 3], "metric.area")
+            self.assertAlmostEqual(table[1, 3], rows[0]["metrics"]["area"])
+            self.assertAlmostEqual(table[3, 3] / area, 1.1, 3)
+            with open(path) as infile:
+                self.assertEqual(len(infile.readlines()), len(variants) + 1)
+            self.assertEqual(len(design_sweep.read_checkpoint(path, variants)), len(variants))
+
+            self.assertRaises(ValueError, design_sweep.read_checkpoint, path, variants[::-1])
+
+        self.assertAlmostEqual(self.glider2d.get_glider_3d().area, area)
+
+
+def fail_variant(glider_2d, fail):
+    # module-level to be usable in the worker processes
+    if fail:
+        raise ValueError("invalid variant")
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -20,6 +20,8 @@
 import tempfile
 import json
 
+import numpy as np
+
 from common import *
 from openglider.plots import PlotMaker
 from openglider import jsonify
@@ -100,6 +102,43 @@ class TestGlider(TestCase):
             glider = jsonify.load(outfile)['data']
         self.assertEqualGlider2D(self.glider_2d, glider)
 
+    def test_export_glider_json_binary(self):
+        path_list = self.tempfile("kite_3d.json")
+        openglider.save(self.glider, path_list)
+
+        for array_format in ("base64", "npz"):
+            path = self.tempfile("kite_3d_{}.json".format(array_format))
+            openglider.save(self.glider, path, array_format=array_format)
+            self.assertLess(os.path.getsize(path), os.path.getsize(path_list))
+            self.assertEqualGlider(self.glider, openglider.load(path))
+
+        data = jsonify.loads(jsonify.dumps(self.glider.ribs[0].profile_2d, array_format="base64"))["data"]
+        self.assertTrue(np.array_equal(data.data, self.glider.ribs[0].profile_2d.data))
+        self.assertRaises(ValueError, jsonify.dumps, self.glider, array_format="npz")
+
+    def test_load_profile(self):
+        path = self.tempfile("kite_3d.json")
+        openglider.save(self.glider, path)
+
+        profile = jsonify.LoadProfile()
+        glider = openglider.load(path, profile=profile)
+        self.assertEqualGlider(self.glider, glider)
+
+        counts = {name: count for module, name, count, duration in profile.get_table()}
+        self.assertEqual(counts["Rib"], len(self.glider.ribs))
+        self.assertEqual(counts["Cell"], len(self.glider.cells))
+        self.assertGreaterEqual(profile.total, sum(row[3] for row in profile.get_table()))
+        self.assertIn("openglider.glider.rib.rib.Rib", str(profile))
+
+        # changed patterns invalidate the resolved elements
+        forbidden = openglider.config["json_forbidden_modules"]
+        openglider.config.json_forbidden_modules = forbidden + [r"openglider\.glider\.rib.*"]
+        try:
+            self.assertRaises(Exception, openglider.load, path)
+        finally:
+            openglider.config.json_forbidden_modules = forbidden
+        openglider.load(path)
+
 
 
 
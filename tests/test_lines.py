@@ -1,3 +1,4 @@
+import copy
 import unittest
 import os
 
@@ -33,6 +34,49 @@ class TestLines(unittest.TestCase):
     def test_case_4(self):
         self.runcase(test_dir+"/lines/TEST_INPUT_FILE_4.txt")
 
+    def test_sag_solvers(self):
+        key_dict = import_lines(test_dir+"/lines/TEST_INPUT_FILE_1.txt")
+        lineset = LineSet(key_dict["LINES"][2], [10, 0, 1])
+        lineset._calc_geo()
+
+        results = {}
+        for solver in ("dense", "sparse", "tree"):
+            lineset._calc_sag(solver=solver)
+            results[solver] = [(line.sag_par_1, line.sag_par_2) for line in lineset.lines]
+
+        for solver in ("sparse", "tree"):
+            for (a1, b1), (a2, b2) in zip(results["dense"], results[solver]):
+                self.assertAlmostEqual(a1, a2)
+                self.assertAlmostEqual(b1, b2)
+
+    def test_node_index(self):
+        key_dict = import_lines(test_dir+"/lines/TEST_INPUT_FILE_2.txt")
+        lineset = LineSet(key_dict["LINES"][2], [10, 0, 1])
+
+        for node in lineset.nodes:
+            upper = [line for line in lineset.lines if line.lower_node is node]
+            lower = [line for line in lineset.lines if line.upper_node is node]
+            self.assertEqual(lineset.get_upper_connected_lines(node), upper)
+            self.assertEqual(lineset.get_lower_connected_lines(node), lower)
+
+        # changing the connectivity has to invalidate the index
+        line = lineset.lowest_lines[0]
+        node = line.upper_node
+        upper_line = lineset.get_upper_connected_lines(node)[0]
+        upper_line.lower_node = line.lower_node
+        self.assertNotIn(upper_line, lineset.get_upper_connected_lines(node))
+        self.assertIn(upper_line, lineset.get_upper_connected_lines(line.lower_node))
+
+        lineset.lines.remove(upper_line)
+        self.assertNotIn(upper_line, lineset.get_upper_connected_lines(line.lower_node))
+
+        # a line replaced in place
+        index = lineset.lines.index(line)
+        new_line = copy.copy(line)
+        lineset.lines[index] = new_line
+        self.assertIn(new_line, lineset.get_upper_connected_lines(line.lower_node))
+        self.assertNotIn(line, lineset.get_upper_connected_lines(line.lower_node))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -1,9 +1,12 @@
+import tempfile
 import unittest
 
+import numpy as np
+
 
 from common import *
 
-from openglider.mesh import Mesh, Vertex, Polygon
+from openglider.mesh import Mesh, Vertex, Polygon, ArrayMesh
 import openglider
 from openglider.utils.distribution import Distribution
 
@@ -28,6 +31,25 @@ class TestMesh(TestCase):
             matches = [vertex.is_equal(p) for p in m3.vertices]
             self.assertTrue(any(matches))
 
+    def test_merge_duplicates(self):
+        nodes_1 = [Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0)]
+        nodes_2 = [Vertex(0, 0, 1e-4), Vertex(1, 0, 0), Vertex(2, 1, 0)]
+        m1 = Mesh({"a": [Polygon(nodes_1[:])]}, boundary_nodes={"j": list(nodes_1)})
+        m2 = Mesh({"b": [Polygon(nodes_2[:])]}, boundary_nodes={"j": list(nodes_2)})
+        m1 += m2
+
+        replaced, statistics = m1.copy().merge_duplicates()
+        self.assertEqual(statistics["merged"], 1)
+        self.assertEqual(statistics["max_distance"], 0)
+
+        replaced, statistics = m1.merge_duplicates(tolerance=1e-3)
+        self.assertEqual(statistics["nodes"], 6)
+        self.assertEqual(statistics["merged"], 2)
+        self.assertAlmostEqual(statistics["max_distance"], 1e-4)
+        self.assertIs(replaced[nodes_2[0]], nodes_1[0])
+        self.assertIs(replaced[nodes_2[1]], nodes_1[1])
+        self.assertEqual(len(m1.vertices), 4)
+
     def test_glider_mesh(self):
         dist = Distribution.from_nose_cos_distribution(30, 0.2)
         dist.add_glider_fixed_nodes(self.glider)
@@ -41,6 +63,50 @@ class TestMesh(TestCase):
         m.delete_duplicates()
         m.get_indexed()
 
+    def test_array_mesh(self):
+        mesh = self.glider.get_mesh_hull(2)
+        mesh += self.glider.lineset.get_mesh()
+        array_mesh = ArrayMesh.from_mesh(mesh)
+
+        self.assertEqual(len(array_mesh.vertices), len(mesh.vertices))
+        self.assertEqual(array_mesh.num_polygons, len(mesh.all_polygons))
+        self.assertEqual(array_mesh.export_obj().count("\nf "), mesh.export_obj().count("\nf "))
+
+        mesh_2 = array_mesh.to_mesh()
+        self.assertEqual(len(mesh_2.vertices), len(mesh.vertices))
+        for name, boundary in mesh.boundary_nodes.items():
+            self.assertEqual(len(mesh_2.boundary_nodes[name]), len(boundary))
+
+        array_mesh_2 = array_mesh + array_mesh
+        self.assertEqual(len(array_mesh_2.vertices), 2 * len(array_mesh.vertices))
+        self.assertEqual(array_mesh_2.num_polygons, 2 * array_mesh.num_polygons)
+        first = array_mesh_2.get_faces(num_vertices=4)[0]
+        self.assertGreaterEqual(first.max(), len(array_mesh.vertices))
+        self.assertLess(first.max(), len(array_mesh_2.vertices))
+
+    def test_array_mesh_export(self):
+        mesh = self.glider.get_array_mesh_hull(1)
+        num_faces = sum(len(faces) for faces in mesh.get_faces() if faces.shape[1] > 2)
+        num_triangles = len(mesh.get_triangles())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = mesh.export_obj(os.path.join(directory, "hull.obj"))
+            with open(path) as infile:
+                self.assertEqual(infile.read(), mesh.export_obj())
+
+            for binary in (False, True):
+                path = mesh.export_ply(os.path.join(directory, "hull.ply"), binary=binary)
+                with open(path, "rb") as infile:
+                    header = infile.read(300).split(b"end_header")[0]
+                self.assertIn("element vertex {}".format(len(mesh.vertices)).encode(), header)
+                self.assertIn("element face {}".format(num_faces).encode(), header)
+
+            path = mesh.export_stl(os.path.join(directory, "hull.stl"), chunksize=1000)
+            self.assertEqual(os.path.getsize(path), 84 + 50 * num_triangles)
+            with open(path, "rb") as infile:
+                infile.seek(80)
+                self.assertEqual(np.frombuffer(infile.read(4), dtype="<u4")[0], num_triangles)
+
 
 
 if __name__ == '__main__':
@@ -2,6 +2,7 @@ import unittest
 
 import tempfile
 import os
+import numpy as np
 import openglider
 import openglider.plots
 import openglider.plots.glider
@@ -38,5 +39,19 @@ class TestPlots(TestCase):
         dwg = self.plotmaker.get_all_stacked()["ribs"]
         dwg.export_dxf(os.path.join(TEMPDIR, "test_ribs.dxf"))
 
+    def test_cell_patterns_parallel(self):
+        cells = self.glider_3d.cells[:2]
+        sequential = self.plotmaker.get_cell_patterns(cells)
+        parallel = openglider.plots.PlotMaker(self.glider_3d).get_cell_patterns(cells, processes=2)
+
+        self.assertEqual(len(sequential), len(parallel))
+        for patterns_1, patterns_2 in zip(sequential, parallel):
+            for parts_1, parts_2 in zip(patterns_1, patterns_2):
+                self.assertEqual([part.name for part in parts_1], [part.name for part in parts_2])
+                for part_1, part_2 in zip(parts_1, parts_2):
+                    for line_1, line_2 in zip(part_1.layers["cuts"], part_2.layers["cuts"]):
+                        self.assertTrue(np.allclose(line_1, line_2))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -45,6 +45,14 @@ class TestProfile(unittest.TestCase):
         x = random.random() * random.randint(-1, 1)
         self.assertAlmostEqual(abs(x), self.prof.profilepoint(x)[0])
 
+    def test_ik_values(self):
+        x_values = np.random.random(100) * 2 - 1
+        iks = self.prof.get_ik_values(x_values)
+        for x, ik in zip(x_values, iks):
+            self.assertAlmostEqual(ik, self.prof(x))
+            self.assertAlmostEqual(abs(x), self.prof[ik][0])
+            self.assertEqual(x < 0, ik < self.prof.noseindex)
+
     def test_multiplication(self):
         factor = random.random()
         other = self.prof * factor
@@ -1,5 +1,9 @@
 import unittest
+
+import numpy as np
+
 from common import TestCase
+from openglider.utils.cache import get_cache_statistics, reset_cache_statistics
 
 
 class GliderTestCase2D(TestCase):
@@ -11,5 +15,39 @@ class GliderTestCase2D(TestCase):
         shape = self.shape
         # print(shape)
 
+    def test_evaluation_cache(self):
+        shape_2d = self.glider2d.shape
+        arc = self.glider2d.arc
+        reset_cache_statistics()
+
+        x_values = shape_2d.rib_x_values
+        x_values.insert(0, 1.)
+        self.assertNotEqual(shape_2d.rib_x_values, x_values)
+        x_values = shape_2d.rib_x_values
+        angles = arc.get_rib_angles(x_values)
+        positions = arc.get_arc_positions(x_values)
+        self.assertEqual(arc.get_rib_angles(x_values), angles)
+        shape_2d.get_half_shape()
+
+        statistics = get_cache_statistics()
+        # already evaluated in setUp
+        self.assertEqual(statistics["ParametricShape._rib_distribution"]["misses"], 0)
+        self.assertEqual(statistics["ParametricShape._half_shape"]["misses"], 0)
+        self.assertEqual(statistics["ArcCurve._get_arc_positions"]["misses"], 1)
+
+        # changed parameters
+        shape_2d.cell_num += 2
+        self.assertEqual(len(shape_2d.rib_x_values), len(x_values) + 1)
+        self.assertEqual(len(shape_2d.get_half_shape().ribs), len(x_values) + 1)
+
+        arc.curve.controlpoints = [p * [1, 1.1] for p in arc.curve.controlpoints]
+        arc.rescale(x_values)
+        self.assertFalse(np.allclose(arc.get_arc_positions(x_values).data, positions.data))
+
+        # rescaling again doesn't change the curve (and keeps the cache)
+        curve_hash = hash(arc.curve)
+        arc.rescale(x_values)
+        self.assertEqual(hash(arc.curve), curve_hash)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
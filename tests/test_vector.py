@@ -18,8 +18,9 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenGlider.  If not, see <http://www.gnu.org/licenses/>.
 import numpy as np
-from openglider.vector.functions import norm, normalize, rotation_3d
+from openglider.vector.functions import norm, normalize, rotation_3d, rangefrom, rangefrom_array, cut, cut_array
 from openglider.vector.polyline import PolyLine, PolyLine2D
+from openglider.vector.interpolate import Interpolation
 
 
 __author__ = 'simon'
@@ -93,6 +94,22 @@ class TestVector3D(unittest.TestCase):
                                    "\nresult: i2=" + str(new) + " leng2=" + str(leng2) +
                                    " dist=" + str(norm(thalist[start] - thalist[new])))
 
+    def test_batch_api(self):
+        for thalist in self.vectors:
+            iks = np.random.random(50) * (self.numpoints + 20) - 10
+            points = thalist[iks]
+            for ik, point in zip(iks, points):
+                self.assertAlmostEqual(norm(point - thalist[float(ik)]), 0)
+
+            second = np.random.random(50) * (self.numpoints + 20) - 10
+            lengths = thalist.get_lengths(iks, second)
+            for ik1, ik2, length in zip(iks, second, lengths):
+                self.assertAlmostEqual(length, thalist.get_length(ik1, ik2), 7)
+
+            extend_lengths = np.random.random(50) * 20 - 10
+            new = thalist.extend_array(iks, extend_lengths)
+            np.testing.assert_almost_equal(thalist.get_lengths(iks, new), np.abs(extend_lengths))
+
 
 class TestVector2D(TestVector3D):
     def setUp(self, dim=2):
@@ -129,6 +146,148 @@ class TestVector2D(TestVector3D):
             neu = thalist.cut(p1, p2, i - 1)
             #self.assertAlmostEqual(i, neu[1])
 
+    def test_shift_multiple(self):
+        amounts = np.random.random(len(self.vectors)) - 0.5
+        shifted = [thalist.copy().add_stuff(amount) for thalist, amount in zip(self.vectors, amounts)]
+        PolyLine2D.add_stuff_multiple(self.vectors, amounts)
+        for line_1, line_2 in zip(shifted, self.vectors):
+            np.testing.assert_almost_equal(line_1.data, line_2.data)
+
+        # 180 degree turn -> additional point
+        line = PolyLine2D([[0, 0], [1, 0], [2, 0], [1.5, 0], [1.5, 1]])
+        self.assertEqual(len(line.add_stuff(0.1)), 6)
+        np.testing.assert_almost_equal(line.data[:4], [[0, -0.1], [1, -0.1], [2, -0.1], [2, 0.1]])
+
+        # turn back to the start point (the neighbours of the corner coincide)
+        line = PolyLine2D([[0, 0], [1, 0], [0, 0]]).add_stuff(0.1)
+        np.testing.assert_almost_equal(line.data, [[0, -0.1], [1, -0.1], [1, 0.1], [0, 0.1]])
+        lines = PolyLine2D.add_stuff_multiple([PolyLine2D([[0, 0], [1, 0], [0, 0]])], 0.1)
+        np.testing.assert_almost_equal(lines[0].data, line.data)
+
+    def test_rotate_mirror(self):
+        for thalist in self.vectors[:10]:
+            startpoint = np.random.random(2)
+            rotated = thalist.copy().rotate(np.pi/2, startpoint)
+            diff_1 = thalist.data - startpoint
+            diff_2 = rotated.data - startpoint
+            np.testing.assert_almost_equal(np.linalg.norm(diff_1, axis=1), np.linalg.norm(diff_2, axis=1))
+            np.testing.assert_almost_equal(np.sum(diff_1 * diff_2, axis=1), 0)
+
+            mirrored = thalist.copy().mirror([0, 0], [0, 1])
+            np.testing.assert_almost_equal(mirrored.data, thalist.data * [-1, 1])
+            self.assertEqual(mirrored.get_bbox()[1][0], -thalist.get_bbox()[0][0])
+
+    def test_cut_array(self):
+        for thalist in self.vectors[:10]:
+            p1, p2 = np.random.random((2, 2)) * 100
+            iks_1, iks_2 = cut_array(thalist.data[:-1], thalist.data[1:], p1, p2)
+            for i, (ik_1, ik_2) in enumerate(zip(iks_1, iks_2)):
+                _, k, l = cut(thalist[i], thalist[i+1], p1, p2)
+                self.assertAlmostEqual(ik_1, k)
+                self.assertAlmostEqual(ik_2, l)
+
+            startpoint = random.randint(0, len(thalist))
+            self.assertEqual(list(rangefrom_array(len(thalist)-1, startpoint)),
+                             list(rangefrom(len(thalist)-1, startpoint)))
+
+            for ik_1, ik_2 in thalist.cut(p1, p2, startpoint, extrapolate=True):
+                self.assertAlmostEqual(norm(thalist[ik_1] - (p1 + ik_2 * (p2 - p1))), 0, 5)
+
+            other = PolyLine2D(np.random.random((5, 2)) * 100)
+            cuts = list(thalist.cut_with_polyline(other, startpoint))
+            self.assertEqual(cuts, list(thalist.cut_with_polyline(other.data, startpoint)))
+
+    def test_cache_invalidation(self):
+        from openglider.utils.cache import get_cache_statistics, reset_cache_statistics, clear_cache
+        reset_cache_statistics()
+        for thalist in self.vectors:
+            normv = thalist.normvectors
+            self.assertIs(normv, thalist.normvectors)
+            thalist[1] = thalist[1] + [1., 1.]
+            self.assertIsNot(normv, thalist.normvectors)
+
+        stats = get_cache_statistics()["PolyLine2D.normvectors"]
+        self.assertEqual(stats["hits"], len(self.vectors))
+        self.assertEqual(stats["misses"], 2 * len(self.vectors))
+
+        normv = self.vectors[0].normvectors
+        clear_cache()
+        self.assertIsNot(normv, self.vectors[0].normvectors)
+
+    def test_copy_on_write(self):
+        for thalist in self.vectors[:10]:
+            data = thalist.data.copy()
+            copied = thalist.copy()
+
+            # the arrays are shared read-only
+            self.assertRaises(ValueError, thalist.data.__setitem__, (0, 0), 0.)
+
+            thalist[0] = thalist[0] + [1., 1.]
+            thalist.data = thalist.data * 2
+            thalist.data[1, 0] += 1.
+            np.testing.assert_array_equal(copied.data, data)
+            np.testing.assert_almost_equal(thalist.data[1], data[1] * 2 + [1, 0])
+
+            copied[1] = [0., 0.]
+            np.testing.assert_almost_equal(thalist.data[1], data[1] * 2 + [1, 0])
+
+    def test_interpolation(self):
+        for thalist in self.vectors:
+            data = thalist.data.copy()
+            data[:, 0].sort()
+            interpolation = Interpolation(data)
+            x_values = data[0, 0] + np.random.random(50) * (data[-1, 0] - data[0, 0])
+
+            values = interpolation(x_values)
+            self.assertEqual(values.shape, x_values.shape)
+            np.testing.assert_almost_equal(values, np.interp(x_values, data[:, 0], data[:, 1]))
+            np.testing.assert_almost_equal(interpolation(data[:, 0]), data[:, 1])
+            self.assertAlmostEqual(interpolation(x_values[0]), np.interp(x_values[0], data[:, 0], data[:, 1]))
+
+            # linear extrapolation with the first/last segment
+            p1, p2 = data[-2:]
+            x = data[-1, 0] + 10
+            self.assertAlmostEqual(interpolation(x), p1[1] + (x - p1[0]) / (p2[0] - p1[0]) * (p2[1] - p1[1]))
+
+            interpolation.extrapolate = False
+            self.assertRaises(ValueError, interpolation, data[0, 0] - 1)
+
+    def test_interpolation_unsorted(self):
+        for thalist in self.vectors[:10]:
+            x_values = np.random.random(50) * 120 - 10
+            for extrapolate in (True, False):
+                interpolation = Interpolation(thalist.data, extrapolate=extrapolate)
+                values = interpolation(x_values) if extrapolate else None
+                for i, x in enumerate(x_values):
+                    try:
+                        expected = interpolate_loop(thalist.data, x, extrapolate)
+                    except Exception:
+                        self.assertRaises(ValueError, interpolation, x)
+                        continue
+                    self.assertAlmostEqual(interpolation(x), expected)
+                    if values is not None:
+                        self.assertAlmostEqual(values[i], expected)
+
+
+def interpolate_loop(data, xval, extrapolate=True):
+    # reference: the original (scalar) Interpolation.__call__
+    last_point = data[0]
+    for index, point in enumerate(data):
+        if index == 0:
+            continue
+
+        lower_bound = extrapolate or last_point[0] < xval
+        end_of_list = extrapolate and index == len(data) - 1
+
+        if (lower_bound and xval < point[0]) or end_of_list:
+            d_x = point[0] - last_point[0]
+            return last_point[1] + (xval-last_point[0])/d_x * (point[1] - last_point[1])
+
+        last_point = point
+
+    raise Exception
+
+
 class TestVectorFunctions3D(unittest.TestCase):
     def setUp(self):
         self.vectors = [